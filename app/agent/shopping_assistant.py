@@ -1,9 +1,10 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import openai
 from dotenv import load_dotenv
 import os
 import json
-from ..elasticsearch.indexer import search_products, get_suggestions
+from ..elasticsearch.indexer import search_products_detailed, msearch_products, get_suggestions
+from ..elasticsearch.query_builder import build_search_query
 from ..models.user_preferences import UserPreferencesManager
 from ..database.database import SessionLocal
 
@@ -200,6 +201,41 @@ Ne yapmak istersiniz? Size yardımcı olmaktan memnuniyet duyarım! 😊"""
         
         return "\n".join(result)
 
+    def _build_relaxation_ladder(
+        self,
+        search_params: Dict[str, Any],
+        personalization: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Sonuçsuz aramalar için gevşetilmiş arama varyantlarını sırasıyla oluştur.
+
+        Elasticsearch sorgusu ilk aramayla aynı olan basamaklar (ör. sorguya
+        yansımayan bir filtrenin kaldırılması) tekrar gönderilmez.
+        """
+        filters = search_params.get("filters") or {}
+        primary_query = build_search_query(search_params["query"], filters, personalization)
+        ladder = []
+
+        # 1. Renk filtresini kaldır
+        if "color" in filters:
+            relaxed_filters = {name: value for name, value in filters.items() if name != "color"}
+            if build_search_query(search_params["query"], relaxed_filters, personalization) != primary_query:
+                ladder.append(("color", {
+                    "query": search_params["query"],
+                    "filters": relaxed_filters,
+                    "size": 10,
+                    "personalization": personalization
+                }))
+
+        # 2. Sadece marka adıyla ara
+        if filters.get("brand"):
+            ladder.append(("brand", {
+                "query": filters["brand"],
+                "filters": {},
+                "size": 10
+            }))
+
+        return ladder
+
     async def process_message(self, user_message: str, user_id: Optional[str] = None) -> str:
         """Kullanıcı mesajını işle ve yanıt üret"""
         try:
@@ -229,43 +265,43 @@ Ne yapmak istersiniz? Size yardımcı olmaktan memnuniyet duyarım! 😊"""
             search_params = self._extract_search_parameters(user_message)
             print(f"[DEBUG] Search parameters: {json.dumps(search_params, indent=2, ensure_ascii=False)}")
             
+            if not search_params.get("filters"):
+                search_params["filters"] = {}
+
+            # Kullanıcı tercihleri filtre değil, sorgu içinde sıralama boost'u olarak uygulanır
+            personalization = None
             if user_id:
                 prefs = self.prefs_manager.get_user_preferences(user_id)
-                if not search_params.get("filters"):
-                    search_params["filters"] = {}
+                personalization = {}
                 if prefs["preferred_brands"] and not search_params["filters"].get("brand"):
-                    search_params["filters"]["preferred_brands"] = prefs["preferred_brands"]
+                    personalization["preferred_brands"] = prefs["preferred_brands"]
                 if prefs["favorite_categories"] and not search_params["filters"].get("category"):
-                    search_params["filters"]["preferred_categories"] = prefs["favorite_categories"]
+                    personalization["preferred_categories"] = prefs["favorite_categories"]
 
-            # İlk aramayı yap
-            products = search_products(
+            # İlk aramayı yap - sonuçlar zaten kişiselleştirilmiş sırada geldiği için ilk 10 yeterli
+            search_result = await search_products_detailed(
                 query=search_params["query"],
                 filters=search_params.get("filters", {}),
-                size=100
+                size=10,
+                personalization=personalization
             )
+            products = search_result["hits"]
             
-            print(f"[DEBUG] Found {len(products)} products")
+            print(f"[DEBUG] Found {len(products)} products (tier: {search_result['tier']})")
             
-            # Ürün bulunamadıysa, filtreleri gevşeterek tekrar dene
+            # Ürün bulunamadıysa, gevşetilmiş aramaların hepsini tek _msearch ile dene
             if not products:
-                # Kullanıcının orijinal arama terimlerini sakla
-                original_query = search_params["query"]
-                original_filters = search_params.get("filters", {}).copy()
-                
-                # Renk filtresi varsa kaldır ve tekrar dene
-                if "color" in search_params.get("filters", {}):
-                    search_params["filters"].pop("color")
-                    products = search_products(
-                        query=search_params["query"],
-                        filters=search_params.get("filters", {}),
-                        size=100
-                    )
-                    
-                    if products:
-                        response = f"""Üzgünüm, tam olarak istediğiniz renkte ürün bulamadım. Ancak aradığınız ürünün diğer renk seçenekleri mevcut:
+                ladder = self._build_relaxation_ladder(search_params, personalization)
+                if ladder:
+                    ladder_results = await msearch_products([request for _, request in ladder])
+                    for (rung, request), rung_products in zip(ladder, ladder_results):
+                        if not rung_products:
+                            continue
 
-{self._format_product_suggestions(products)}
+                        if rung == "color":
+                            return f"""Üzgünüm, tam olarak istediğiniz renkte ürün bulamadım. Ancak aradığınız ürünün diğer renk seçenekleri mevcut:
+
+{self._format_product_suggestions(rung_products)}
 
 İsterseniz:
 1. Farklı bir renk seçebilirsiniz
@@ -273,21 +309,11 @@ Ne yapmak istersiniz? Size yardımcı olmaktan memnuniyet duyarım! 😊"""
 3. Benzer ürünlere bakabiliriz
 
 Size nasıl yardımcı olabilirim?"""
-                        return response
-
-                # Marka spesifik arama yap
-                if "brand" in search_params.get("filters", {}):
-                    brand_name = search_params["filters"]["brand"]
-                    similar_products = search_products(
-                        query=brand_name,
-                        filters={},
-                        size=10
-                    )
-                    
-                    if similar_products:
-                        response = f"""Üzgünüm, aradığınız spesifik {brand_name} ürününü bulamadım, ancak bu markadan başka ürünler mevcut:
 
-{self._format_product_suggestions(similar_products)}
+                        brand_name = search_params["filters"]["brand"]
+                        return f"""Üzgünüm, aradığınız spesifik {brand_name} ürününü bulamadım, ancak bu markadan başka ürünler mevcut:
+
+{self._format_product_suggestions(rung_products)}
 
 İsterseniz:
 1. Bu ürünlerden birini inceleyebilirsiniz
@@ -295,7 +321,6 @@ Size nasıl yardımcı olabilirim?"""
 3. Benzer ürünlere bakabiliriz
 
 Nasıl devam etmek istersiniz?"""
-                        return response
 
             if user_id:
                 self.prefs_manager.add_search_history(
@@ -306,6 +331,8 @@ Nasıl devam etmek istersiniz?"""
                 )
             
             product_suggestions = self._format_product_suggestions(products)
+            if not products and search_result.get("suggestion"):
+                product_suggestions += f"\n\nBunu mu demek istediniz: \"{search_result['suggestion']}\""
             
             messages = [
                 {
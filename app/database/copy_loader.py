@@ -0,0 +1,194 @@
+from typing import Iterable, Iterator, Dict, Any, List, Sequence
+import datetime
+import itertools
+import json
+import time
+from .database import engine
+
+# COPY'ye tek read() çağrısında verilen yaklaşık veri boyutu
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Yükleme sırasında düşürülüp sonra tek seferde yeniden kurulan indeksler
+PRODUCT_SECONDARY_INDEXES = {
+    "ix_products_id": "(id)",
+    "ix_products_brand": "(brand)",
+    "ix_products_category": "(category)",
+    "ix_products_updated_at_id": "(updated_at, id)",
+}
+PRODUCT_COPY_COLUMNS = ["brand", "price", "category", "model", "target_audience", "description", "updated_at"]
+PRODUCT_STAGING_TABLE = "products_staging"
+
+def _copy_value(value: Any) -> str:
+    """Değeri COPY text formatına çevirir (NULL -> \\N, özel karakterler kaçışlı)"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+class CopyStream:
+    """Satır iterator'ünü copy_expert'in okuyabileceği dosya benzeri nesneye çevirir.
+
+    Satırlar okundukça üretilir; bellekte en fazla bir tampon kadar veri durur.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buffer = ""
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        target = size if size and size > 0 else COPY_BUFFER_SIZE
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while length < target:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_value(value) for value in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(parts)
+        self._buffer = data[target:]
+        return data[:target]
+
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterable[Sequence[Any]]) -> int:
+    """Satırları COPY FROM STDIN ile tabloya akıtır, yazılan satır sayısını döndürür"""
+    stream = CopyStream(rows)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+        stream,
+        size=COPY_BUFFER_SIZE
+    )
+    return stream.count
+
+def copy_into(table: str, columns: List[str], rows: Iterable[Sequence[Any]]) -> int:
+    """Kendi bağlantısını açıp satırları tabloya COPY ile yazar ve commit eder"""
+    conn = engine.raw_connection()
+    try:
+        count = copy_rows(conn.cursor(), table, columns, rows)
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def _create_product_indexes(cursor, table: str, suffix: str = "") -> None:
+    for name, columns in PRODUCT_SECONDARY_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name}{suffix} ON {table} {columns}")
+
+def _drop_product_indexes(cursor) -> None:
+    for name in PRODUCT_SECONDARY_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+def _reset_product_id_sequence(cursor, table: str = "products") -> None:
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('products', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+    )
+
+def _swap_in_staging(cursor) -> None:
+    """Dolu staging tablosunu tek işlemde products'ın yerine koyar"""
+    cursor.execute("SELECT pg_get_serial_sequence('products', 'id')")
+    sequence = cursor.fetchone()[0]
+    cursor.execute("SELECT 1 FROM pg_trigger WHERE tgname = 'products_touch_updated_at' AND NOT tgisinternal")
+    has_trigger = cursor.fetchone() is not None
+
+    # Sequence eski tabloyla birlikte silinmesin
+    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {PRODUCT_STAGING_TABLE}.id")
+    cursor.execute("DROP TABLE products")
+    cursor.execute(f"ALTER TABLE {PRODUCT_STAGING_TABLE} RENAME TO products")
+    cursor.execute(f"ALTER TABLE products RENAME CONSTRAINT {PRODUCT_STAGING_TABLE}_pkey TO products_pkey")
+    for name in PRODUCT_SECONDARY_INDEXES:
+        cursor.execute(f"ALTER INDEX {name}_staging RENAME TO {name}")
+    if has_trigger:
+        cursor.execute(
+            "CREATE TRIGGER products_touch_updated_at BEFORE UPDATE ON products "
+            "FOR EACH ROW EXECUTE FUNCTION products_touch_updated_at()"
+        )
+
+def _product_rows(records: Iterable[Dict[str, Any]], with_ids: bool, loaded_at: datetime.datetime) -> Iterator[List[Any]]:
+    for record in records:
+        row = [record.get(column) for column in PRODUCT_COPY_COLUMNS[:-1]]
+        row.append(record.get("updated_at") or loaded_at)
+        if with_ids:
+            row.insert(0, record["id"])
+        yield row
+
+def copy_products(
+    records: Iterable[Dict[str, Any]],
+    truncate: bool = True,
+    staging: bool = False,
+    rebuild_indexes: bool = True
+) -> int:
+    """Ürün kayıtlarını COPY FROM STDIN ile products tablosuna yükler.
+
+    staging=False: (truncate ise tablo boşaltılır) ikincil indeksler düşürülür,
+    satırlar doğrudan products'a kopyalanır ve indeksler yeniden kurulur.
+
+    staging=True: satırlar indekssiz UNLOGGED bir staging tablosuna
+    kopyalanır, tablo LOGGED yapılıp indeksleri kurulur ve tek işlemde
+    products ile yer değiştirir. Yükleme boyunca eski tablo okunabilir kalır;
+    tablonun tamamı değiştirildiği için truncate yok sayılır.
+
+    Kayıtlarda "id" varsa (ilk kayda bakılır) korunur ve sequence ileri alınır.
+    Yükleme sonrası Elasticsearch için tam yeniden indeksleme gerekir.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return 0
+    records = itertools.chain([first], records)
+    with_ids = first.get("id") is not None
+    columns = (["id"] if with_ids else []) + PRODUCT_COPY_COLUMNS
+    loaded_at = datetime.datetime.utcnow()
+
+    started_at = time.time()
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if staging:
+            cursor.execute(f"DROP TABLE IF EXISTS {PRODUCT_STAGING_TABLE}")
+            cursor.execute(f"CREATE UNLOGGED TABLE {PRODUCT_STAGING_TABLE} (LIKE products INCLUDING DEFAULTS)")
+            count = copy_rows(cursor, PRODUCT_STAGING_TABLE, columns, _product_rows(records, with_ids, loaded_at))
+            print(f"{count} ürün staging tablosuna kopyalandı ({time.time() - started_at:.2f} saniye)")
+            cursor.execute(f"ALTER TABLE {PRODUCT_STAGING_TABLE} SET LOGGED")
+            cursor.execute(f"ALTER TABLE {PRODUCT_STAGING_TABLE} ADD PRIMARY KEY (id)")
+            _create_product_indexes(cursor, PRODUCT_STAGING_TABLE, suffix="_staging")
+            conn.commit()
+
+            _swap_in_staging(cursor)
+            _reset_product_id_sequence(cursor)
+            conn.commit()
+        else:
+            if truncate:
+                cursor.execute("TRUNCATE products")
+            if rebuild_indexes:
+                _drop_product_indexes(cursor)
+            count = copy_rows(cursor, "products", columns, _product_rows(records, with_ids, loaded_at))
+            print(f"{count} ürün kopyalandı ({time.time() - started_at:.2f} saniye)")
+            if rebuild_indexes:
+                _create_product_indexes(cursor, "products")
+            if with_ids:
+                _reset_product_id_sequence(cursor)
+            conn.commit()
+
+        cursor.execute("ANALYZE products")
+        conn.commit()
+        print(f"Ürün yüklemesi tamamlandı: {count} satır, {time.time() - started_at:.2f} saniye")
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from app.database.database import Base
 from app.models.user_preferences import UserPreferences, SearchHistory
+from app.models.product import Product
+from app.models.sync_state import SyncState
 import os
 from dotenv import load_dotenv
 
@@ -31,5 +33,68 @@ def create_tables():
         print(f"Tablo oluşturma hatası: {e}")
         return False
 
+# Var olan products tablosuna artımlı senkronizasyon kolonlarını ekler.
+# Trigger, ORM dışındaki (psql, COPY sonrası UPDATE vb.) güncellemelerde de
+# updated_at'in ilerlemesini sağlar.
+PRODUCT_CHANGE_TRACKING_SQL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP",
+    "UPDATE products SET updated_at = timezone('utc', now()) WHERE updated_at IS NULL",
+    "ALTER TABLE products ALTER COLUMN updated_at SET DEFAULT timezone('utc', now())",
+    "ALTER TABLE products ALTER COLUMN updated_at SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_products_updated_at_id ON products (updated_at, id)",
+    """
+    CREATE OR REPLACE FUNCTION products_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := timezone('utc', now());
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS products_touch_updated_at ON products",
+    """
+    CREATE TRIGGER products_touch_updated_at
+    BEFORE UPDATE ON products
+    FOR EACH ROW EXECUTE FUNCTION products_touch_updated_at()
+    """,
+]
+
+def product_change_tracking_applied(conn) -> bool:
+    """deleted_at kolonu ve updated_at trigger'ı zaten var mı"""
+    has_column = conn.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'products' AND column_name = 'deleted_at'"
+    )).first() is not None
+    has_trigger = conn.execute(text(
+        "SELECT 1 FROM pg_trigger WHERE tgname = 'products_touch_updated_at' AND NOT tgisinternal"
+    )).first() is not None
+    return has_column and has_trigger
+
+def add_product_change_tracking():
+    """products tablosuna updated_at/deleted_at ve sync_state tablosunu ekler.
+
+    Tekrar çalıştırılması güvenlidir; uygulanmışsa hiçbir şey yapmaz.
+    """
+    from app.database.database import engine
+
+    try:
+        with engine.begin() as conn:
+            applied = product_change_tracking_applied(conn)
+        if applied:
+            SyncState.__table__.create(engine, checkfirst=True)
+            return True
+
+        print("Ürün değişiklik takibi ekleniyor...")
+        with engine.begin() as conn:
+            for statement in PRODUCT_CHANGE_TRACKING_SQL:
+                conn.execute(text(statement))
+        SyncState.__table__.create(engine, checkfirst=True)
+        print("Değişiklik takibi hazır!")
+        return True
+    except Exception as e:
+        print(f"Değişiklik takibi migration hatası: {e}")
+        return False
+
 if __name__ == "__main__":
-    create_tables() 
\ No newline at end of file
+    create_tables()
+    add_product_change_tracking() 
\ No newline at end of file
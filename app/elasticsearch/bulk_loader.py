@@ -0,0 +1,239 @@
+from typing import Iterable, Dict, Any, Optional, List
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import streaming_bulk
+from dotenv import load_dotenv
+import threading
+import hashlib
+import orjson
+import queue
+import time
+import os
+from .es_client import get_document_routing, PRODUCT_INDEX
+
+load_dotenv()
+
+# Toplu yükleme ayarları
+BULK_WORKERS = int(os.getenv("ES_BULK_WORKERS", "4"))
+BULK_CHUNK_SIZE = int(os.getenv("ES_BULK_CHUNK_SIZE", "2000"))
+BULK_MAX_CHUNK_BYTES = int(os.getenv("ES_BULK_MAX_CHUNK_BYTES", str(10 * 1024 * 1024)))
+BULK_MAX_RETRIES = int(os.getenv("ES_BULK_MAX_RETRIES", "5"))
+BULK_INITIAL_BACKOFF = float(os.getenv("ES_BULK_INITIAL_BACKOFF", "1"))
+BULK_PROGRESS_EVERY = int(os.getenv("ES_BULK_PROGRESS_EVERY", "50000"))
+
+# Kuyruktaki iş parçacıklarına "iş bitti" sinyali
+_STOP = object()
+
+def compute_content_hash(source: Dict[str, Any]) -> str:
+    """Dökümanın içerik özeti; artımlı senkronizasyon değişmeyenleri bununla atlar"""
+    payload = {key: value for key, value in source.items() if key != "content_hash"}
+    return hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def build_product_delete_action(product_id: int, category: Optional[str], index: str = PRODUCT_INDEX) -> Dict[str, Any]:
+    """Silinen ürün için bulk delete action'ı"""
+    action = {"_op_type": "delete", "_index": index, "_id": product_id}
+    routing = get_document_routing(category)
+    if routing:
+        action["routing"] = routing
+    return action
+
+def build_product_action(
+    product_id: Optional[int],
+    brand: str,
+    model: str,
+    price: float,
+    category: str,
+    target_audience: str,
+    description: str,
+    index: str = PRODUCT_INDEX
+) -> Dict[str, Any]:
+    """Ürün alanlarından tek bir bulk index action'ı oluşturur"""
+    source = {
+        "id": product_id,
+        "brand": brand,
+        "model": model,
+        "price": price,
+        "category": category,
+        "target_audience": target_audience,
+        "description": description,
+        "suggest": {
+            "input": [brand, model, category]
+        }
+    }
+    source["content_hash"] = compute_content_hash(source)
+    action = {
+        "_op_type": "index",
+        "_index": index,
+        "_source": source
+    }
+    if product_id is not None:
+        action["_id"] = product_id
+    routing = get_document_routing(category)
+    if routing:
+        action["routing"] = routing
+    return action
+
+class BulkLoader:
+    """Action akışını sabit bellekle, paralel bulk isteklerle Elasticsearch'e yükler.
+
+    Üretici action'ları chunk'lara böler ve sınırlı bir kuyruğa koyar; kuyruk
+    doluysa bekler (backpressure). İşçi thread'ler her chunk'ı
+    streaming_bulk ile gönderir, 429 reddedilen dökümanlar üstel backoff ile
+    tekrar denenir.
+
+    throttle verilirse (bkz. bulk_throttle.AdaptiveThrottle) yükleme boyunca
+    aynı anda istek gönderen işçi sayısı ve chunk boyutu canlı olarak ayarlanır.
+    refresh verilirse (ör. "wait_for") her bulk isteğine aynen geçirilir.
+    """
+
+    def __init__(
+        self,
+        es: Elasticsearch,
+        workers: int = BULK_WORKERS,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        max_chunk_bytes: int = BULK_MAX_CHUNK_BYTES,
+        max_retries: int = BULK_MAX_RETRIES,
+        initial_backoff: float = BULK_INITIAL_BACKOFF,
+        throttle=None,
+        refresh: Optional[str] = None
+    ):
+        self.es = es
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.throttle = throttle
+        self.refresh = refresh
+
+        # Throttle chunk boyutunu bu değerin üstüne çıkarmaz
+        self.max_chunk_size = chunk_size
+        # Aynı anda bulk isteği gönderebilecek işçi sayısı (<= workers)
+        self.concurrency = workers
+        self._active = 0
+        self._gate = threading.Condition()
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=workers * 2)
+        self._lock = threading.Lock()
+        self.indexed = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+        self._started_at = 0.0
+        self._last_progress = 0
+
+    def _record(self, indexed: int, failed_items: List[Dict]) -> None:
+        with self._lock:
+            self.indexed += indexed
+            self.failed += len(failed_items)
+            # Hepsini tutmak bellek sorununa yol açar, ilk birkaçı teşhis için yeterli
+            self.errors.extend(failed_items[:max(0, 10 - len(self.errors))])
+            if self.indexed - self._last_progress >= BULK_PROGRESS_EVERY:
+                self._last_progress = self.indexed
+                print(f"İlerleme: {self.indexed} döküman ({self.docs_per_second():.2f} döküman/saniye)")
+
+    def _send_chunk(self, chunk: List[Dict]) -> None:
+        failed_items = []
+        bulk_kwargs = {"refresh": self.refresh} if self.refresh else {}
+        try:
+            for ok, item in streaming_bulk(
+                self.es,
+                chunk,
+                chunk_size=len(chunk),
+                max_chunk_bytes=self.max_chunk_bytes,
+                max_retries=self.max_retries,
+                initial_backoff=self.initial_backoff,
+                raise_on_error=False,
+                raise_on_exception=False,
+                yield_ok=False,
+                **bulk_kwargs
+            ):
+                if not ok:
+                    failed_items.append(item)
+        except Exception as e:
+            # Tekrar denemeler tükendi; chunk'ın tamamını başarısız say
+            print(f"Bulk chunk hatası: {e}")
+            failed_items = [{"error": str(e)}] * len(chunk)
+        self._record(len(chunk) - len(failed_items), failed_items)
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """Aynı anda istek gönderen işçi sayısını değiştirir; fazla işçiler sırasını bekler"""
+        with self._gate:
+            self.concurrency = max(1, min(self.workers, concurrency))
+            self._gate.notify_all()
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Sonraki chunk'ların boyutunu değiştirir"""
+        self.chunk_size = max(1, min(self.max_chunk_size, chunk_size))
+
+    def _worker(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is _STOP:
+                    return
+                with self._gate:
+                    while self._active >= self.concurrency:
+                        self._gate.wait()
+                    self._active += 1
+                try:
+                    self._send_chunk(chunk)
+                finally:
+                    with self._gate:
+                        self._active -= 1
+                        self._gate.notify()
+            finally:
+                self._queue.task_done()
+
+    def docs_per_second(self) -> float:
+        elapsed = time.time() - self._started_at
+        return self.indexed / elapsed if elapsed > 0 else 0.0
+
+    def run(self, actions: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tüm action'ları yükler ve özet istatistikleri döndürür.
+
+        Aynı loader tekrar kullanılabilir; sayaçlar her çalıştırmada sıfırlanır.
+        """
+        with self._lock:
+            self.indexed = 0
+            self.failed = 0
+            self.errors = []
+            self._last_progress = 0
+        self._started_at = time.time()
+        threads = [
+            threading.Thread(target=self._worker, name=f"bulk-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        if self.throttle:
+            self.throttle.start(self)
+
+        try:
+            chunk = []
+            for action in actions:
+                chunk.append(action)
+                if len(chunk) >= self.chunk_size:
+                    self._queue.put(chunk)
+                    chunk = []
+            if chunk:
+                self._queue.put(chunk)
+        finally:
+            for _ in threads:
+                self._queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+            if self.throttle:
+                self.throttle.stop()
+
+        elapsed = time.time() - self._started_at
+        stats = {
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "seconds": round(elapsed, 2),
+            "docs_per_second": round(self.indexed / elapsed, 2) if elapsed > 0 else 0.0,
+            "errors": self.errors
+        }
+        print(
+            f"Toplam {stats['indexed']} döküman {stats['seconds']} saniyede yüklendi "
+            f"({stats['docs_per_second']} döküman/saniye, {stats['failed']} hata)"
+        )
+        return stats
@@ -0,0 +1,149 @@
+from typing import Dict, Any, Optional, List
+from elasticsearch import Elasticsearch, NotFoundError
+from dotenv import load_dotenv
+import threading
+import time
+import os
+from .es_client import PRODUCT_INDEX
+from .query_builder import build_search_body
+
+load_dotenv()
+
+# Yükleme sırasında canlı arama gecikmesini izleyen geri besleme kontrolü
+BULK_THROTTLE_ENABLED = os.getenv("ES_BULK_THROTTLE", "false").lower() == "true"
+BULK_THROTTLE_TARGET_MS = float(os.getenv("ES_BULK_THROTTLE_TARGET_MS", "200"))
+BULK_THROTTLE_INTERVAL = float(os.getenv("ES_BULK_THROTTLE_INTERVAL", "5"))
+BULK_THROTTLE_MIN_CHUNK_SIZE = int(os.getenv("ES_BULK_THROTTLE_MIN_CHUNK_SIZE", "200"))
+# Gecikme hedefin bu oranının altındaysa yük artırılır; arada kalırsa olduğu gibi bırakılır
+BULK_THROTTLE_LOW_WATERMARK = 0.7
+
+# Gecikme ölçümünde kullanılan, /chat aramalarına benzeyen sorgular
+THROTTLE_PROBE_QUERIES = [
+    ("*", {"max_price": 1000}),
+    ("spor ayakkabı", {}),
+]
+
+class AdaptiveThrottle:
+    """Toplu yükleme sırasında arama gecikmesini hedefin altında tutar (AIMD).
+
+    Her aralıkta örnek sorguların süresi ölçülür ve node'lardaki search/write
+    thread pool reddetme sayıları okunur. Gecikme hedefi aşarsa ya da yeni
+    reddetme varsa aktif işçi sayısı ve chunk boyutu yarıya indirilir; gecikme
+    rahat seviyedeyse işçi bir artırılır, chunk boyutu ilk değerine doğru büyür.
+    """
+
+    def __init__(
+        self,
+        es: Elasticsearch,
+        target_ms: float = BULK_THROTTLE_TARGET_MS,
+        interval: float = BULK_THROTTLE_INTERVAL,
+        min_chunk_size: int = BULK_THROTTLE_MIN_CHUNK_SIZE,
+        probe_index: str = PRODUCT_INDEX
+    ):
+        self.es = es
+        self.target_ms = target_ms
+        self.interval = interval
+        self.min_chunk_size = min_chunk_size
+        self.probe_index = probe_index
+
+        self.loader = None
+        self.decisions: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_rejections: Optional[int] = None
+
+    def probe_latency_ms(self) -> Optional[float]:
+        """Örnek sorguların en yavaşının süresi; alias henüz yoksa None.
+
+        Zaman aşımı gibi hatalar küme zorlandığı için oluşur, hedefin
+        aşıldığı kabul edilir.
+        """
+        slowest = None
+        for query, filters in THROTTLE_PROBE_QUERIES:
+            started_at = time.perf_counter()
+            try:
+                # request cache gerçek gecikmeyi gizlemesin
+                self.es.search(index=self.probe_index, body=build_search_body(query, filters, 10), request_cache=False)
+            except NotFoundError:
+                return None
+            except Exception as e:
+                print(f"Throttle ölçüm hatası: {e}")
+                return float("inf")
+            elapsed = (time.perf_counter() - started_at) * 1000
+            slowest = elapsed if slowest is None else max(slowest, elapsed)
+        return slowest
+
+    def probe_rejections(self) -> int:
+        """Son ölçümden beri search ve write thread pool'larında reddedilen istek sayısı"""
+        try:
+            stats = self.es.nodes.stats(metric="thread_pool")
+        except Exception as e:
+            print(f"Thread pool istatistik hatası: {e}")
+            return 0
+
+        total = 0
+        for node in stats.get("nodes", {}).values():
+            pools = node.get("thread_pool", {})
+            total += pools.get("search", {}).get("rejected", 0)
+            total += pools.get("write", {}).get("rejected", 0)
+
+        # İlk ölçüm sadece taban değeri belirler
+        new_rejections = 0 if self._last_rejections is None else max(0, total - self._last_rejections)
+        self._last_rejections = total
+        return new_rejections
+
+    def adjust(self, latency_ms: Optional[float], rejections: int) -> None:
+        """Ölçümlere göre yükleyicinin eşzamanlılığını ve chunk boyutunu değiştirir"""
+        loader = self.loader
+        concurrency, chunk_size = loader.concurrency, loader.chunk_size
+
+        if rejections or (latency_ms is not None and latency_ms > self.target_ms):
+            action = "azalt"
+            concurrency = max(1, concurrency // 2)
+            chunk_size = max(min(self.min_chunk_size, loader.max_chunk_size), chunk_size // 2)
+        elif latency_ms is None or latency_ms < self.target_ms * BULK_THROTTLE_LOW_WATERMARK:
+            action = "artır"
+            concurrency = min(loader.workers, concurrency + 1)
+            chunk_size = min(loader.max_chunk_size, chunk_size + max(1, loader.max_chunk_size // 4))
+        else:
+            action = "koru"
+
+        if (concurrency, chunk_size) == (loader.concurrency, loader.chunk_size):
+            # Zaten sınırda; her aralıkta aynı kararı loglama
+            return
+
+        decision = {
+            "action": action,
+            "latency_ms": round(latency_ms, 1) if latency_ms is not None else None,
+            "rejections": rejections,
+            "concurrency": concurrency,
+            "chunk_size": chunk_size
+        }
+        self.decisions.append(decision)
+        print(
+            f"Throttle {action}: gecikme={decision['latency_ms']} ms (hedef {self.target_ms:.0f} ms), "
+            f"reddedilen={rejections}, işçi={concurrency}/{loader.workers}, chunk={chunk_size}"
+        )
+        loader.set_concurrency(concurrency)
+        loader.set_chunk_size(chunk_size)
+
+    def _run(self) -> None:
+        self.probe_rejections()
+        while not self._stop.wait(self.interval):
+            self.adjust(self.probe_latency_ms(), self.probe_rejections())
+
+    def start(self, loader) -> None:
+        self.loader = loader
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bulk-throttle", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+def build_default_throttle(es: Elasticsearch) -> Optional[AdaptiveThrottle]:
+    """ES_BULK_THROTTLE açıksa varsayılan ayarlarla throttle döndürür"""
+    return AdaptiveThrottle(es) if BULK_THROTTLE_ENABLED else None
@@ -1,8 +1,36 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Union, Callable, Awaitable, Tuple
+from collections import Counter
+from dotenv import load_dotenv
+import asyncio
 import redis
 import json
+import orjson
+import hashlib
+import inspect
+import math
+import random
+import time
+import os
 from functools import wraps
 from datetime import timedelta
+from .local_cache import L1Cache, MISSING
+from ..utils.cache_codec import get_cache_codec
+from ..utils.cache_generation import CacheGeneration
+
+load_dotenv()
+
+# Redis önündeki process içi cache; kısa TTL, başka process'lerdeki
+# invalidation'ların en geç bu süre sonunda görülmesini sağlar
+SEARCH_L1_MAX_ENTRIES = int(os.getenv("SEARCH_L1_MAX_ENTRIES", "2000"))
+SEARCH_L1_TTL_SECONDS = float(os.getenv("SEARCH_L1_TTL_SECONDS", "30"))
+
+# Entry'ler verilen TTL'de "bayatlar" (soft expiry) ama bu kadar süre daha
+# saklanır; bayat değer hemen döndürülüp arka planda yenilenir
+SEARCH_CACHE_STALE_SECONDS = int(os.getenv("SEARCH_CACHE_STALE_SECONDS", "3600"))
+# XFetch erken yenileme katsayısı; büyüdükçe yenileme daha erken başlar, 0 kapatır
+SEARCH_CACHE_XFETCH_BETA = float(os.getenv("SEARCH_CACHE_XFETCH_BETA", "1.0"))
+# Aynı key'i aynı anda sadece bir process'in yenilemesi için Redis kilidi
+SEARCH_CACHE_REFRESH_LOCK_SECONDS = int(os.getenv("SEARCH_CACHE_REFRESH_LOCK_SECONDS", "30"))
 
 # Redis connection - optional
 try:
@@ -10,7 +38,6 @@ try:
         host='localhost',
         port=6379,
         db=0,
-        decode_responses=True,
         socket_connect_timeout=1,  # 1 second timeout
         socket_timeout=1
     )
@@ -20,62 +47,488 @@ except:
     print("Redis connection failed. Caching will be disabled.")
     redis_client = None
 
+# Arama entry'leri sadece sıralı ürün id'lerini tutar; ürün dokümanları
+# product:<id> key'lerinde bir kez saklanır ve okurken birleştirilir
+PRODUCT_DOC_PREFIX = "product:"
+
+# Her invalidation global sayacı artırır ve ürünlere bu değeri işaretler;
+# invalidation'dan önce başlamış bir yükleme eski dokümanları geri yazmaz
+INVALIDATION_SEQ_KEY = "search:invalidation_seq"
+INVALIDATION_MARKER_SUFFIX = ":invalidated"
+INVALIDATION_MARKER_SECONDS = int(os.getenv("SEARCH_INVALIDATION_MARKER_SECONDS", "600"))
+
+# Arama key'lerine eklenen nesil; katalog yeniden indekslenince artırılır
+SEARCH_GENERATION_KEY = "search:generation"
+
+def _extract_product_ids(results: Union[List[Dict], Dict[str, Any]]) -> List[int]:
+    """Cache'lenen sonuçtaki ürün id'leri (hit listesi ya da {"hits": [...]} sözlüğü)"""
+    hits = (results.get("hits") or []) if isinstance(results, dict) else results
+    return [hit["id"] for hit in hits if isinstance(hit, dict) and hit.get("id") is not None]
+
+def _normalize_results(results: Union[List[Dict], Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], List[Dict]]]:
+    """Sonucu (id listeli entry, ürün dokümanları) olarak ayırır.
+
+    Hit'lerden biri id'siz ise None döner; böyle bir sonuç ürün bazında
+    invalidate edilemeyeceği için Redis'e yazılmaz.
+    """
+    is_dict = isinstance(results, dict)
+    hits = (results.get("hits") or []) if is_dict else results
+    if not all(isinstance(hit, dict) and hit.get("id") is not None for hit in hits):
+        return None
+    entry = {"ids": [hit["id"] for hit in hits]}
+    if is_dict:
+        entry["result"] = {name: value for name, value in results.items() if name != "hits"}
+    return entry, hits
+
 class CacheManager:
-    def __init__(self):
-        self.cache = redis_client
-        self.default_ttl = timedelta(hours=24)
-
-    def get_cache_key(self, query: str, filters: Dict[str, Any]) -> str:
-        """Cache key oluştur"""
-        cache_key = f"search:{query}"
-        if filters:
-            # Filtreleri sırala ve cache key'e ekle
-            sorted_filters = sorted(filters.items())
-            cache_key += f":{json.dumps(sorted_filters)}"
-        return cache_key
+    """Arama sonuçları için iki katmanlı cache: process içi L1 + Redis (L2).
+
+    Tek instance paylaşılır; aynı anahtar için eşzamanlı miss'ler tek bir
+    backend çağrısında birleştirilir (single-flight).
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            instance = super(CacheManager, cls).__new__(cls)
+            instance.cache = redis_client
+            instance.default_ttl = timedelta(hours=24)
+            instance.local = L1Cache(SEARCH_L1_MAX_ENTRIES, SEARCH_L1_TTL_SECONDS)
+            instance.codec = get_cache_codec()
+            instance.generation = CacheGeneration(redis_client, SEARCH_GENERATION_KEY)
+            instance.stats = Counter()
+            instance._inflight = {}
+            # Redis yokken invalidation sırası process içinde tutulur
+            instance._local_seq = 0
+            instance._local_invalidations = {}
+            cls._instance = instance
+        return cls._instance
+
+    def get_cache_key(
+        self,
+        query: Optional[str],
+        filters: Optional[Dict[str, Any]] = None,
+        size: int = 10,
+        personalization: Optional[Dict[str, Any]] = None,
+        facets: bool = False,
+        mode: str = "tiered"
+    ) -> str:
+        """Sonucu belirleyen tüm parametrelerden kanonik cache key oluştur.
+
+        Aynı sonucu üreten istekler (boşluk farkı, filtre sırası, değeri boş
+        filtreler) aynı key'e düşer. Key geçerli index neslini içerir; nesil
+        artınca eski key'ler bir daha okunmaz. mode, aynı parametrelerle
+        farklı sonuç üreten arama yollarını (kademeli arama / msearch) ayırır.
+        """
+        if not query or not isinstance(query, str) or not query.strip():
+            query = "*"
+        params = {
+            "query": " ".join(query.split()),
+            "filters": {name: value for name, value in (filters or {}).items() if value is not None and value != ""},
+            "size": int(size),
+            # Kişiselleştirme kısa bir özet olarak eklenir; aynı tercih
+            # profiline sahip kullanıcılar entry'leri paylaşır
+            "personalization": self._personalization_digest(personalization) if personalization else None,
+            "facets": bool(facets),
+            "mode": mode
+        }
+        digest = hashlib.sha1(orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)).hexdigest()
+        return f"search:g{self.generation.current()}:{digest}"
+
+    def bump_generation(self) -> int:
+        """Tüm arama cache'ini tek bir INCR ile mantıksal olarak geçersiz kılar"""
+        generation = self.generation.bump()
+        # Eski nesildeki L1 entry'leri artık okunmaz, belleği hemen boşalt
+        self.local.clear()
+        print(f"Arama cache nesli: {generation}")
+        return generation
+
+    @staticmethod
+    def _personalization_digest(personalization: Dict[str, Any]) -> str:
+        """Aynı tercih profiline sahip kullanıcılar aynı özeti üretir"""
+        normalized = sorted(
+            (name, sorted(values)) for name, values in personalization.items() if values
+        )
+        return hashlib.sha1(json.dumps(normalized).encode("utf-8")).hexdigest()[:12]
 
     def get_cached_results(self, cache_key: str) -> Optional[List[Dict]]:
-        """Cache'den sonuçları getir"""
+        """Cache'den taze sonuçları getir (önce L1, sonra Redis); bayatsa None"""
+        record = self._get_record(cache_key)
+        if record is None or time.time() >= record[1]:
+            return None
+        return record[0]
+
+    def _get_record(self, cache_key: str) -> Optional[Tuple[Any, float, float]]:
+        """(sonuç, soft expiry zamanı, yeniden hesaplama süresi) ya da None"""
+        cached = self.local.get(cache_key)
+        if cached is not MISSING:
+            self.stats["l1_hits"] += 1
+            return cached
+        self.stats["l1_misses"] += 1
+
         if not self.cache:
             return None
         try:
             cached_data = self.cache.get(cache_key)
             if cached_data:
-                return json.loads(cached_data)
+                entry = self.codec.decode(cached_data)
+                results = self._hydrate(entry)
+                if results is not None:
+                    self.stats["l2_hits"] += 1
+                    record = (results, entry.get("soft_expires", 0.0), entry.get("delta", 0.0))
+                    self._set_local(cache_key, record, entry.get("hard_expires", 0.0))
+                    return record
+                # Ürünlerden biri invalidate edilmiş ya da düşmüş; yeniden hesaplanır
+                self.stats["l2_hydrate_misses"] += 1
         except Exception as e:
             print(f"Cache okuma hatası: {e}")
+        self.stats["l2_misses"] += 1
         return None
 
-    def set_cached_results(self, cache_key: str, results: List[Dict], ttl: Optional[timedelta] = None) -> None:
-        """Sonuçları cache'e kaydet"""
+    def _set_local(self, cache_key: str, record: Tuple[Any, float, float], hard_expires: float) -> None:
+        # L1 entry'si Redis'teki kopyadan uzun yaşamamalı
+        self.local.set(cache_key, record, _extract_product_ids(record[0]), max(hard_expires - time.time(), 0.001))
+
+    def _hydrate(self, entry: Any) -> Optional[Union[List[Dict], Dict[str, Any]]]:
+        """Entry'deki id'lerin dokümanlarını tek MGET ile alıp sonucu yeniden kurar"""
+        if not isinstance(entry, dict) or "ids" not in entry:
+            return None
+
+        hits = []
+        if entry["ids"]:
+            docs = self.cache.mget([f"{PRODUCT_DOC_PREFIX}{product_id}" for product_id in entry["ids"]])
+            if any(doc is None for doc in docs):
+                return None
+            hits = [self.codec.decode(doc) for doc in docs]
+        if "result" not in entry:
+            return hits
+        return {**entry["result"], "hits": hits}
+
+    def get_invalidation_seq(self) -> Optional[int]:
+        """Yükleme başlamadan önce okunur ve set_cached_results'a verilir"""
+        if not self.cache:
+            return self._local_seq
+        try:
+            return int(self.cache.get(INVALIDATION_SEQ_KEY) or 0)
+        except Exception as e:
+            print(f"Cache okuma hatası: {e}")
+            return None
+
+    def _invalidated_since(self, product_ids: List[int], seq: int) -> bool:
+        if not product_ids:
+            return False
+        if not self.cache:
+            return any(self._local_invalidations.get(product_id, 0) > seq for product_id in product_ids)
+        markers = self.cache.mget([f"{PRODUCT_DOC_PREFIX}{product_id}{INVALIDATION_MARKER_SUFFIX}" for product_id in product_ids])
+        return any(marker is not None and int(marker) > seq for marker in markers)
+
+    def set_cached_results(
+        self,
+        cache_key: str,
+        results: List[Dict],
+        ttl: Optional[timedelta] = None,
+        delta: float = 0.0,
+        since_seq: Optional[int] = None
+    ) -> None:
+        """Sonuçları cache'e kaydet: sorgu için id listesi, her ürün için ayrı doküman.
+
+        ttl sonunda entry bayatlar, SEARCH_CACHE_STALE_SECONDS sonra silinir.
+        delta, sonucu hesaplamanın sürdüğü saniyedir (erken yenileme için).
+        since_seq, yükleme başlamadan önce okunan get_invalidation_seq değeridir;
+        o andan sonra ürünlerinden biri invalidate edildiyse sonuç yazılmaz.
+        """
+        if isinstance(results, dict) and results.get("error"):
+            # Backend hatasıyla boş dönen sonuç iyi bir (bayat) entry'nin yerine geçmesin
+            self.stats["uncached_errors"] += 1
+            return
+        if since_seq is not None:
+            try:
+                if self._invalidated_since(_extract_product_ids(results), since_seq):
+                    self.stats["invalidated_loads"] += 1
+                    return
+            except Exception as e:
+                print(f"Cache okuma hatası: {e}")
+                return
+        ttl = ttl or self.default_ttl
+        hard_ttl = ttl + timedelta(seconds=SEARCH_CACHE_STALE_SECONDS)
+        now = time.time()
+        soft_expires = now + ttl.total_seconds()
+        hard_expires = now + hard_ttl.total_seconds()
+        self._set_local(cache_key, (results, soft_expires, delta), hard_expires)
         if not self.cache:
             return
         try:
-            ttl = ttl or self.default_ttl
-            self.cache.setex(
-                cache_key,
-                ttl,
-                json.dumps(results)
-            )
+            normalized = _normalize_results(results)
+            if normalized is None:
+                self.stats["unnormalized_results"] += 1
+                return
+            entry, docs = normalized
+            entry.update(soft_expires=soft_expires, hard_expires=hard_expires, delta=delta)
+            pipe = self.cache.pipeline(transaction=False)
+            pipe.setex(cache_key, hard_ttl, self.codec.encode(entry))
+            # Dokümanlar her yazımda tazelenir; aynı ürün tüm sorgular için bir kez saklanır
+            for doc in docs:
+                pipe.setex(f"{PRODUCT_DOC_PREFIX}{doc['id']}", hard_ttl, self.codec.encode(doc))
+            pipe.execute()
         except Exception as e:
             print(f"Cache yazma hatası: {e}")
 
+    @staticmethod
+    def _should_refresh_early(now: float, soft_expires: float, delta: float) -> bool:
+        """XFetch: süre dolmaya yaklaştıkça ve hesaplama pahalılaştıkça artan
+        olasılıkla erken yenileme; yenilemeler zamana yayılır"""
+        if delta <= 0 or SEARCH_CACHE_XFETCH_BETA <= 0:
+            return False
+        return now - delta * SEARCH_CACHE_XFETCH_BETA * math.log(1.0 - random.random()) >= soft_expires
+
+    def _acquire_refresh_lock(self, cache_key: str) -> bool:
+        if not self.cache:
+            return True
+        try:
+            return bool(self.cache.set(f"{cache_key}:refresh", b"1", nx=True, ex=SEARCH_CACHE_REFRESH_LOCK_SECONDS))
+        except Exception as e:
+            print(f"Cache kilit hatası: {e}")
+            return False
+
+    def _release_refresh_lock(self, cache_key: str) -> None:
+        if not self.cache:
+            return
+        try:
+            self.cache.delete(f"{cache_key}:refresh")
+        except Exception as e:
+            print(f"Cache kilit hatası: {e}")
+
+    def _start_load(
+        self,
+        cache_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[timedelta],
+        release_lock: bool = False
+    ) -> asyncio.Future:
+        async def load():
+            self.stats["backend_calls"] += 1
+            since_seq = self.get_invalidation_seq()
+            started_at = time.monotonic()
+            results = await loader()
+            self.set_cached_results(cache_key, results, ttl, time.monotonic() - started_at, since_seq)
+            return results
+
+        def finished(done: asyncio.Future) -> None:
+            if self._inflight.get(cache_key) is done:
+                self._inflight.pop(cache_key, None)
+            if release_lock:
+                self._release_refresh_lock(cache_key)
+            # Arka plan yenilemesini kimse beklemeyebilir; hatayı burada görünür kıl
+            if not done.cancelled() and done.exception() is not None:
+                print(f"Cache yenileme hatası ({cache_key}): {done.exception()}")
+
+        task = asyncio.ensure_future(load())
+        self._inflight[cache_key] = task
+        task.add_done_callback(finished)
+        return task
+
+    async def get_or_load(self, cache_key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[timedelta] = None) -> Any:
+        """Cache'te yoksa loader'ı çalıştırıp sonucu cache'ler.
+
+        Aynı anahtar için yükleme sürerken gelen istekler yeni bir backend
+        çağrısı yapmaz, süren yüklemenin sonucunu bekler. Bayat (ya da XFetch
+        ile erken yenilemeye seçilen) entry hemen döndürülür ve arka planda
+        tek bir yenileme başlatılır.
+        """
+        record = self._get_record(cache_key)
+        if record is not None:
+            results, soft_expires, delta = record
+            now = time.time()
+            stale = now >= soft_expires
+            if not stale and not self._should_refresh_early(now, soft_expires, delta):
+                return results
+            if cache_key not in self._inflight and self._acquire_refresh_lock(cache_key):
+                self.stats["stale_refreshes" if stale else "early_refreshes"] += 1
+                self._start_load(cache_key, loader, ttl, release_lock=True)
+            if stale:
+                self.stats["stale_served"] += 1
+            return results
+
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        # İlk isteyen iptal edilse de bekleyen diğerleri için yükleme sürer
+        return await asyncio.shield(self._start_load(cache_key, loader, ttl))
+
+    def _start_batch_load(
+        self,
+        cache_keys: List[str],
+        positions: List[int],
+        loader: Callable[[List[int]], Awaitable[List[Any]]],
+        ttl: Optional[timedelta],
+        locked_keys: List[str]
+    ) -> asyncio.Future:
+        # Her anahtarın _inflight'taki future'ı çağıran tarafından kaydedilmiştir
+        futures = {position: self._inflight[cache_keys[position]] for position in positions}
+
+        async def load():
+            self.stats["backend_calls"] += 1
+            since_seq = self.get_invalidation_seq()
+            started_at = time.monotonic()
+            loaded = await loader(positions)
+            delta = time.monotonic() - started_at
+            for position, results in zip(positions, loaded):
+                self.set_cached_results(cache_keys[position], results, ttl, delta, since_seq)
+                futures[position].set_result(results)
+            return loaded
+
+        def finished(done: asyncio.Future) -> None:
+            error = None
+            if not done.cancelled():
+                error = done.exception()
+            for position, future in futures.items():
+                if not future.done():
+                    if done.cancelled():
+                        future.cancel()
+                    else:
+                        future.set_exception(error or RuntimeError("Toplu yükleme eksik sonuç döndürdü"))
+                        # Hata aşağıda yazdırılıyor; bekleyeni olmayan future uyarı üretmesin
+                        future.exception()
+                cache_key = cache_keys[position]
+                if self._inflight.get(cache_key) is future:
+                    self._inflight.pop(cache_key, None)
+            for cache_key in locked_keys:
+                self._release_refresh_lock(cache_key)
+            if error is not None:
+                print(f"Cache toplu yükleme hatası ({len(positions)} anahtar): {error}")
+
+        task = asyncio.ensure_future(load())
+        task.add_done_callback(finished)
+        return task
+
+    async def get_or_load_many(
+        self,
+        cache_keys: List[str],
+        loader: Callable[[List[int]], Awaitable[List[Any]]],
+        ttl: Optional[timedelta] = None
+    ) -> List[Any]:
+        """get_or_load'un toplu hali.
+
+        Her anahtar get_or_load'daki gibi ele alınır: taze entry döner, bayat
+        entry hemen döner ve yenilenir, süren yüklemesi olan anahtar onu
+        bekler. Yüklenmesi gereken anahtarlar (miss'ler ve yenilenecek
+        entry'ler) tek bir loader çağrısında toplanır. loader, bu anahtarların
+        cache_keys içindeki sıralarını alır ve sonuçları aynı sırayla döndürür.
+        """
+        loop = asyncio.get_event_loop()
+        results: List[Any] = [None] * len(cache_keys)
+        waiting: Dict[int, asyncio.Future] = {}
+        to_load: List[int] = []
+        locked_keys: List[str] = []
+
+        for position, cache_key in enumerate(cache_keys):
+            record = self._get_record(cache_key)
+            if record is not None:
+                results[position], soft_expires, delta = record
+                now = time.time()
+                stale = now >= soft_expires
+                if not stale and not self._should_refresh_early(now, soft_expires, delta):
+                    continue
+                if cache_key not in self._inflight and self._acquire_refresh_lock(cache_key):
+                    self.stats["stale_refreshes" if stale else "early_refreshes"] += 1
+                    self._inflight[cache_key] = loop.create_future()
+                    locked_keys.append(cache_key)
+                    to_load.append(position)
+                if stale:
+                    self.stats["stale_served"] += 1
+                continue
+
+            # Aynı istekte tekrarlanan anahtar da buradan ilk kopyayı bekler
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                waiting[position] = future
+                continue
+
+            waiting[position] = self._inflight[cache_key] = loop.create_future()
+            to_load.append(position)
+
+        if to_load:
+            self._start_batch_load(cache_keys, to_load, loader, ttl, locked_keys)
+
+        if waiting:
+            # İlk isteyen iptal edilse de bekleyen diğerleri için yükleme sürer
+            loaded = await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+            for position, value in zip(waiting, loaded):
+                results[position] = value
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """L1/L2 isabet, birleştirme ve kabul politikası sayaçları"""
+        return {
+            **self.stats,
+            "l1": self.local.get_stats(),
+            "redis_enabled": self.cache is not None
+        }
+
+    def invalidate_products(self, product_ids: Iterable[int], batch_size: int = 500) -> int:
+        """Verilen ürünlerin cache'lenmiş dokümanlarını siler.
+
+        Bu ürünleri içeren arama entry'leri bir sonraki okumada eksik doküman
+        nedeniyle miss sayılır ve yeniden hesaplanır; diğer entry'ler
+        etkilenmez. Ürünlere invalidation sırası işaretlenir, böylece o sırada
+        süren yüklemeler eski dokümanları geri yazmaz. Silinen L1 entry'si ve
+        Redis dokümanı sayısını döndürür.
+        """
+        product_ids = list(product_ids)
+        if not self.cache:
+            self._local_seq += 1
+            for product_id in product_ids:
+                self._local_invalidations[product_id] = self._local_seq
+            return self.local.invalidate_products(product_ids)
+
+        deleted = 0
+        try:
+            seq = self.cache.incr(INVALIDATION_SEQ_KEY)
+            for start in range(0, len(product_ids), batch_size):
+                batch = product_ids[start:start + batch_size]
+                pipe = self.cache.pipeline(transaction=False)
+                for product_id in batch:
+                    pipe.set(f"{PRODUCT_DOC_PREFIX}{product_id}{INVALIDATION_MARKER_SUFFIX}", seq, ex=INVALIDATION_MARKER_SECONDS)
+                pipe.delete(*[f"{PRODUCT_DOC_PREFIX}{product_id}" for product_id in batch])
+                deleted += pipe.execute()[-1]
+        except Exception as e:
+            print(f"Cache invalidation hatası: {e}")
+        # L1 en son temizlenir; Redis'ten geri dolan eski entry kalmasın
+        return deleted + self.local.invalidate_products(product_ids)
+
 def cache_search_results(ttl: Optional[timedelta] = None):
-    """Search sonuçlarını cache'leyen decorator"""
+    """Search sonuçlarını cache'leyen decorator (sync ve async fonksiyonları destekler)
+
+    Argümanlar (pozisyonel olanlar ve varsayılanlar dahil) fonksiyonun
+    imzasına bağlanıp get_cache_key'e verilir; dekore edilen fonksiyonun
+    parametreleri get_cache_key'in parametreleriyle aynı olmalıdır.
+    """
     def decorator(func):
+        signature = inspect.signature(func)
+
+        def build_cache_key(cache_mgr: CacheManager, args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cache_mgr.get_cache_key(**bound.arguments)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_mgr = CacheManager()
+                cache_key = build_cache_key(cache_mgr, args, kwargs)
+                return await cache_mgr.get_or_load(cache_key, lambda: func(*args, **kwargs), ttl)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Cache manager instance
             cache_mgr = CacheManager()
             
-            # Redis bağlantısı yoksa direkt fonksiyonu çalıştır
-            if not cache_mgr.cache:
-                return func(*args, **kwargs)
-            
             # Cache key oluştur
-            query = kwargs.get('query', '')
-            filters = kwargs.get('filters', {})
-            cache_key = cache_mgr.get_cache_key(query, filters)
+            cache_key = build_cache_key(cache_mgr, args, kwargs)
             
             # Cache'den kontrol et
             cached_results = cache_mgr.get_cached_results(cache_key)
@@ -91,4 +544,4 @@ def cache_search_results(ttl: Optional[timedelta] = None):
             
             return results
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
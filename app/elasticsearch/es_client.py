@@ -1,6 +1,10 @@
-from elasticsearch import Elasticsearch
-from typing import Optional
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+from elasticsearch.serializer import JsonSerializer
+from elastic_transport import SerializationError
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
+import hashlib
+import orjson
 import os
 
 # Force reload environment variables
@@ -10,106 +14,324 @@ load_dotenv(override=True)
 ELASTICSEARCH_URL = os.getenv("ELASTICSEARCH_URL", "http://172.17.0.2:9200")
 print(f"Loaded ELASTICSEARCH_URL from env: {ELASTICSEARCH_URL}")
 
+# Bağlantı havuzu ayarları
+ES_MAX_CONNECTIONS = int(os.getenv("ES_MAX_CONNECTIONS", "25"))
+ES_REQUEST_TIMEOUT = float(os.getenv("ES_REQUEST_TIMEOUT", "30"))
+ES_HTTP_COMPRESS = os.getenv("ES_HTTP_COMPRESS", "true").lower() == "true"
+
+class OrjsonSerializer(JsonSerializer):
+    """Standart json modülü yerine orjson kullanan serializer"""
+
+    def loads(self, data: bytes) -> Any:
+        # Bazı yanıtlar JSON content-type ile boş gövde döner
+        if data == b"":
+            return None
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(
+                message=f"Unable to deserialize as JSON: {data!r}", errors=(e,)
+            )
+
+    def dumps(self, data: Any) -> bytes:
+        # Önceden serialize edilmiş gövdeleri olduğu gibi gönder
+        if isinstance(data, str):
+            return data.encode("utf-8", "surrogatepass")
+        if isinstance(data, bytes):
+            return data
+        try:
+            return orjson.dumps(data, default=self.default)
+        except TypeError as e:
+            raise SerializationError(
+                message=f"Unable to serialize to JSON: {data!r} (type: {type(data).__name__})",
+                errors=(e,),
+            )
+
+def _client_options() -> Dict[str, Any]:
+    """Sync ve async istemcilerin ortak bağlantı ayarları"""
+    return {
+        "verify_certs": False,
+        "request_timeout": ES_REQUEST_TIMEOUT,
+        "connections_per_node": ES_MAX_CONNECTIONS,
+        "http_compress": ES_HTTP_COMPRESS,
+        "serializer": OrjsonSerializer(),
+        "retry_on_timeout": True,
+        "max_retries": 2,
+        "headers": {"Connection": "keep-alive"},
+    }
+
+# Uygulama ömrü boyunca paylaşılan istemciler
+_es_client: Optional[Elasticsearch] = None
+_async_es_client: Optional[AsyncElasticsearch] = None
+
 def get_es_client() -> Optional[Elasticsearch]:
+    """Script'ler ve toplu işlemler için paylaşılan sync istemciyi döndürür.
+
+    İstemci ilk çağrıda oluşturulup ping ile doğrulanır, sonraki çağrılar
+    aynı bağlantı havuzunu kullanır.
+    """
+    global _es_client
+    if _es_client is not None:
+        return _es_client
     try:
         print(f"Trying to connect to Elasticsearch at: {ELASTICSEARCH_URL}")
-        es = Elasticsearch(
-            ELASTICSEARCH_URL,
-            verify_certs=False,
-            request_timeout=60
-        )
+        es = Elasticsearch(ELASTICSEARCH_URL, **_client_options())
         if es.ping():
             print("Successfully connected to Elasticsearch")
+            _es_client = es
             return es
         print("Failed to ping Elasticsearch")
+        es.close()
         return None
     except Exception as e:
         print(f"Elasticsearch connection error (detailed): {str(e)}")
         return None
 
+def get_async_es_client() -> AsyncElasticsearch:
+    """API tarafında (indexer, asistan, GraphQL) paylaşılan async istemciyi döndürür.
+
+    Normalde FastAPI lifespan içinde `init_async_es_client` ile oluşturulur;
+    lifespan dışında (script, test) ilk çağrıda tembel olarak oluşturulur.
+    """
+    global _async_es_client
+    if _async_es_client is None:
+        _async_es_client = AsyncElasticsearch(ELASTICSEARCH_URL, **_client_options())
+    return _async_es_client
+
+async def init_async_es_client() -> AsyncElasticsearch:
+    """Async istemciyi oluştur ve bağlantıyı bir kez doğrula"""
+    es = get_async_es_client()
+    try:
+        if await es.ping():
+            print("Successfully connected to Elasticsearch")
+        else:
+            print("Failed to ping Elasticsearch")
+    except Exception as e:
+        print(f"Elasticsearch connection error (detailed): {str(e)}")
+    return es
+
+async def close_async_es_client() -> None:
+    """Uygulama kapanırken bağlantı havuzunu kapat"""
+    global _async_es_client
+    if _async_es_client is not None:
+        await _async_es_client.close()
+        _async_es_client = None
+
 # Product index settings
 PRODUCT_INDEX = "products"
-PRODUCT_MAPPING = {
-    "settings": {
-        "number_of_shards": 1,
-        "number_of_replicas": 0,
-        "refresh_interval": "30s",
-        "index": {
-            "max_result_window": 300000
+
+# İndeks profili: "serving" (üretim), "bulk-load" (toplu yükleme), "small-dev" (yerel geliştirme)
+ES_INDEX_PROFILE = os.getenv("ES_INDEX_PROFILE", "serving")
+ES_NUMBER_OF_SHARDS = int(os.getenv("ES_NUMBER_OF_SHARDS", "3"))
+ES_NUMBER_OF_REPLICAS = int(os.getenv("ES_NUMBER_OF_REPLICAS", "1"))
+ES_REFRESH_INTERVAL = os.getenv("ES_REFRESH_INTERVAL", "30s")
+
+# Dökümanları kategoriye göre route et: kategori filtreli sorgular tek shard'a gider
+ES_ROUTE_BY_CATEGORY = os.getenv("ES_ROUTE_BY_CATEGORY", "false").lower() == "true"
+
+# Statik ayarlar sadece indeks oluşturulurken verilebilir; dinamik ayarlar
+# yükleme bittikten sonra put_settings ile değiştirilebilir.
+INDEX_PROFILES = {
+    "serving": {
+        "static": {
+            "number_of_shards": ES_NUMBER_OF_SHARDS,
+            # Fiyata göre sıralı sorgular segment başına erken sonlanabilir
+            "sort.field": "price",
+            "sort.order": "asc",
+            # En büyük alan olan description'ın stored source'u sıkıştırılır
+            "codec": "best_compression"
         },
-        "analysis": {
-            "analyzer": {
-                "turkish_analyzer": {
-                    "type": "custom",
-                    "tokenizer": "standard",
-                    "filter": [
-                        "lowercase",
-                        "turkish_stop",
-                        "turkish_stemmer",
-                        "asciifolding"
-                    ]
-                }
-            },
-            "filter": {
-                "turkish_stop": {
-                    "type": "stop",
-                    "stopwords": "_turkish_"
-                },
-                "turkish_stemmer": {
-                    "type": "stemmer",
-                    "language": "turkish"
-                }
-            }
+        "dynamic": {
+            "number_of_replicas": ES_NUMBER_OF_REPLICAS,
+            "refresh_interval": ES_REFRESH_INTERVAL,
+            "translog.durability": "request"
         }
     },
-    "mappings": {
-        "properties": {
-            "id": {"type": "integer"},
-            "brand": {
-                "type": "text",
-                "fields": {
-                    "keyword": {"type": "keyword", "ignore_above": 256},
-                    "text": {
-                        "type": "text",
-                        "analyzer": "turkish_analyzer"
-                    }
-                }
-            },
-            "model": {
-                "type": "text",
-                "analyzer": "turkish_analyzer",
-                "fields": {
-                    "keyword": {"type": "keyword", "ignore_above": 256}
-                }
-            },
-            "price": {
-                "type": "double",
-                "coerce": True
-            },
-            "category": {
-                "type": "text",
-                "fields": {
-                    "keyword": {"type": "keyword", "ignore_above": 256},
-                    "text": {
-                        "type": "text",
-                        "analyzer": "turkish_analyzer"
-                    }
+    "bulk-load": {
+        # Statik ayarlar hedef profilden gelir; yükleme sırasında refresh ve replika kapalı
+        "static": None,
+        "dynamic": {
+            "number_of_replicas": 0,
+            "refresh_interval": "-1",
+            "translog.durability": "async"
+        }
+    },
+    "small-dev": {
+        "static": {
+            "number_of_shards": 1
+        },
+        "dynamic": {
+            "number_of_replicas": 0,
+            "refresh_interval": "30s",
+            "translog.durability": "async"
+        }
+    }
+}
+
+PRODUCT_ANALYSIS = {
+    "analyzer": {
+        "turkish_analyzer": {
+            "type": "custom",
+            "tokenizer": "standard",
+            "filter": [
+                "lowercase",
+                "turkish_stop",
+                "turkish_stemmer",
+                "asciifolding"
+            ]
+        },
+        "spell_analyzer": {
+            "type": "custom",
+            "tokenizer": "standard",
+            "filter": [
+                "turkish_lowercase",
+                "spell_shingle"
+            ]
+        }
+    },
+    "filter": {
+        "turkish_stop": {
+            "type": "stop",
+            "stopwords": "_turkish_"
+        },
+        "turkish_stemmer": {
+            "type": "stemmer",
+            "language": "turkish"
+        },
+        "turkish_lowercase": {
+            "type": "lowercase",
+            "language": "turkish"
+        },
+        "spell_shingle": {
+            "type": "shingle",
+            "min_shingle_size": 2,
+            "max_shingle_size": 3
+        }
+    }
+}
+
+PRODUCT_MAPPINGS = {
+    "properties": {
+        # Sadece sıralama/tie-break için kullanılır: doc values var, ters indeks yok
+        "id": {"type": "integer", "index": False},
+        "brand": {
+            "type": "text",
+            "copy_to": "spell",
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256, "eager_global_ordinals": True},
+                "text": {
+                    "type": "text",
+                    "analyzer": "turkish_analyzer"
                 }
-            },
-            "target_audience": {
-                "type": "text",
-                "fields": {
-                    "keyword": {"type": "keyword", "ignore_above": 256}
+            }
+        },
+        "model": {
+            "type": "text",
+            "analyzer": "turkish_analyzer",
+            "copy_to": "spell",
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256}
+            }
+        },
+        "price": {
+            "type": "double",
+            "coerce": True
+        },
+        "category": {
+            "type": "text",
+            "copy_to": "spell",
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256, "eager_global_ordinals": True},
+                "text": {
+                    "type": "text",
+                    "analyzer": "turkish_analyzer"
                 }
-            },
-            "description": {
-                "type": "text",
-                "analyzer": "turkish_analyzer"
-            },
-            "suggest": {
-                "type": "completion",
-                "analyzer": "turkish_analyzer"
             }
-        }
+        },
+        "target_audience": {
+            "type": "text",
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256}
+            }
+        },
+        "description": {
+            "type": "text",
+            "analyzer": "turkish_analyzer",
+            # Description üzerinde phrase sorgusu yok; pozisyonları saklama
+            "index_options": "freqs"
+        },
+        "suggest": {
+            "type": "completion",
+            "analyzer": "turkish_analyzer"
+        },
+        "spell": {
+            "type": "text",
+            "analyzer": "spell_analyzer"
+        },
+        # Sadece _source'tan okunur (artımlı senkronizasyon), aranmaz
+        "content_hash": {"type": "keyword", "index": False, "doc_values": False}
+    }
+}
+
+def _get_profile(profile: Optional[str]) -> Dict[str, Any]:
+    profile = profile or ES_INDEX_PROFILE
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Bilinmeyen indeks profili: {profile}")
+    return INDEX_PROFILES[profile]
+
+def get_profile_dynamic_settings(profile: Optional[str] = None) -> Dict[str, Any]:
+    """Profilin put_settings ile uygulanabilen dinamik ayarları"""
+    return dict(_get_profile(profile)["dynamic"])
+
+def build_index_settings(profile: Optional[str] = None, bulk_load: bool = False) -> Dict[str, Any]:
+    """Profilin statik ayarlarıyla indeks oluşturma ayarlarını üretir.
+
+    bulk_load=True ise dinamik ayarlar "bulk-load" profilinden alınır; yükleme
+    bittikten sonra profilin kendi dinamik ayarları uygulanmalıdır.
+    """
+    profile = profile or ES_INDEX_PROFILE
+    static = _get_profile(profile)["static"]
+    if static is None:
+        # bulk-load profilinin kendi statik ayarı yok, serving ile oluşturulur
+        static = INDEX_PROFILES["serving"]["static"]
+    dynamic = get_profile_dynamic_settings("bulk-load" if bulk_load else profile)
+    return {"index": {**static, **dynamic}, "analysis": PRODUCT_ANALYSIS}
+
+def _build_mappings() -> Dict[str, Any]:
+    mappings = PRODUCT_MAPPINGS
+    if ES_ROUTE_BY_CATEGORY:
+        # Routing'siz yazma/okuma yanlış shard'a gitmesin diye zorunlu kıl
+        mappings = {"_routing": {"required": True}, **PRODUCT_MAPPINGS}
+    return mappings
+
+def get_mapping_hash() -> str:
+    """Mapping ve analiz ayarlarının özeti.
+
+    İndeks oluşturulurken mapping'in _meta alanına yazılır; snapshot'tan
+    dönülürken kodla uyuşmayan (eski) indeksleri ayırt etmek için kullanılır.
+    """
+    payload = {"mappings": _build_mappings(), "analysis": PRODUCT_ANALYSIS}
+    return hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def build_product_mapping(profile: Optional[str] = None, bulk_load: bool = False) -> Dict[str, Any]:
+    """indices.create için settings + mappings gövdesi"""
+    return {
+        "settings": build_index_settings(profile, bulk_load),
+        "mappings": {"_meta": {"mapping_hash": get_mapping_hash()}, **_build_mappings()}
     }
-} 
\ No newline at end of file
+
+# Kategorisi boş/NULL ürünlerin routing değeri; _routing zorunlu olduğu için
+# routing'siz yazılamazlar
+UNCATEGORIZED_ROUTING = "_uncategorized"
+
+def get_document_routing(category: Optional[str]) -> Optional[str]:
+    """Döküman yazarken kullanılacak routing değeri (routing kapalıysa None)"""
+    if not ES_ROUTE_BY_CATEGORY:
+        return None
+    return category or UNCATEGORIZED_ROUTING
+
+def get_search_routing(filters: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Kategori filtreli aramalarda sadece ilgili shard'ı hedefle; diğerleri tüm shard'lara gider"""
+    if not filters or not filters.get("category"):
+        return None
+    return get_document_routing(filters["category"])
@@ -0,0 +1,246 @@
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from sqlalchemy import tuple_, text
+from contextlib import contextmanager
+from elasticsearch import Elasticsearch
+from dotenv import load_dotenv
+import datetime
+import time
+import os
+from ..database.database import SessionLocal, engine
+from ..models.product import Product
+from ..models.sync_state import SyncState
+from .es_client import get_es_client, get_document_routing, PRODUCT_INDEX, ES_ROUTE_BY_CATEGORY
+from .bulk_loader import BulkLoader, build_product_action, build_product_delete_action
+from .cache_manager import CacheManager
+
+load_dotenv()
+
+# Watermark tablosundaki kayıt adı
+SYNC_STATE_NAME = "products_es"
+SYNC_BATCH_SIZE = int(os.getenv("ES_SYNC_BATCH_SIZE", "1000"))
+# Henüz commit edilmemiş işlemlerin satırlarını kaçırmamak için son birkaç
+# saniyeyi bir sonraki çalıştırmaya bırak; tekrar okunan satırlar hash ile atlanır
+SYNC_SAFETY_LAG = datetime.timedelta(seconds=float(os.getenv("ES_SYNC_SAFETY_LAG_SECONDS", "5")))
+# Artımlı senkronizasyon ile tam indekslemenin watermark geri sarmasını
+# sıralayan PostgreSQL advisory lock anahtarı
+SYNC_LOCK_KEY = 72_418_001
+
+# Değişiklik okunan kolonlar
+SYNC_COLUMNS = (
+    Product.id,
+    Product.brand,
+    Product.model,
+    Product.price,
+    Product.category,
+    Product.target_audience,
+    Product.description,
+    Product.updated_at,
+    Product.deleted_at
+)
+
+def load_watermark(db) -> Tuple[Optional[datetime.datetime], int]:
+    """Kayıtlı (updated_at, id) high-water mark'ı; ilk çalıştırmada (None, 0)"""
+    state = db.query(SyncState).filter(SyncState.name == SYNC_STATE_NAME).first()
+    if not state:
+        return None, 0
+    return state.last_updated_at, state.last_id
+
+def save_watermark(db, last_updated_at: datetime.datetime, last_id: int) -> None:
+    state = db.query(SyncState).filter(SyncState.name == SYNC_STATE_NAME).first()
+    if not state:
+        state = SyncState(name=SYNC_STATE_NAME)
+        db.add(state)
+    state.last_updated_at = last_updated_at
+    state.last_id = last_id
+    db.commit()
+
+@contextmanager
+def sync_lock():
+    """Senkronizasyon kilidi; kendi bağlantısında tutulur, Session commit'lerinden etkilenmez"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SYNC_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SYNC_LOCK_KEY})
+
+def rewind_watermark(since: datetime.datetime) -> None:
+    """Watermark'ı since'a geri alır (zaten gerideyse dokunmaz).
+
+    Tam yeniden indeksleme yayınlanınca çağrılır: yükleme sürerken değişip
+    sadece eski indekse senkronize edilen satırlar bir sonraki artımlı
+    çalıştırmada yeni indekse tekrar gönderilir (değişmeyenler hash ile atlanır).
+    Süren bir senkronizasyon varsa bitmesi beklenir, aksi halde geri sarmanın
+    üzerine yazabilirdi.
+    """
+    with sync_lock():
+        db = SessionLocal()
+        try:
+            last_updated_at, _ = load_watermark(db)
+            if last_updated_at is None or last_updated_at > since:
+                save_watermark(db, since, 0)
+                print(f"Senkronizasyon watermark'ı geri alındı: {since}")
+        finally:
+            db.close()
+
+def iter_changed_rows(
+    db,
+    since: Optional[datetime.datetime],
+    since_id: int,
+    until: datetime.datetime,
+    batch_size: int = SYNC_BATCH_SIZE
+) -> Iterator[List[Tuple]]:
+    """Watermark'tan sonra değişen (silinenler dahil) satırları parti parti döndürür.
+
+    (updated_at, id) üzerinde keyset pagination kullanılır; aynı zaman
+    damgasına sahip satırlar parti sınırında kaybolmaz.
+    """
+    while True:
+        query = db.query(*SYNC_COLUMNS).filter(Product.updated_at <= until)
+        if since is not None:
+            query = query.filter(tuple_(Product.updated_at, Product.id) > tuple_(since, since_id))
+        rows = query.order_by(Product.updated_at, Product.id).limit(batch_size).all()
+        if not rows:
+            return
+        yield rows
+        since, since_id = rows[-1].updated_at, rows[-1].id
+
+def fetch_indexed_hashes(es: Elasticsearch, rows: List[Tuple], index: str = PRODUCT_INDEX) -> Dict[int, Optional[str]]:
+    """Partideki ürünlerin güncel routing'lerindeki content_hash'lerini tek mget ile okur.
+
+    mget gerçek zamanlıdır (refresh beklemez). Dönen sözlükte olmayan id'ler
+    güncel routing'de indekste yoktur.
+    """
+    docs = []
+    for row in rows:
+        doc = {"_id": row.id}
+        routing = get_document_routing(row.category)
+        if routing:
+            doc["routing"] = routing
+        docs.append(doc)
+
+    response = es.mget(index=index, docs=docs, source=["content_hash"])
+    return {
+        int(doc["_id"]): doc.get("_source", {}).get("content_hash")
+        for doc in response["docs"]
+        if doc.get("found")
+    }
+
+def fetch_misrouted_copies(es: Elasticsearch, rows: List[Tuple], index: str = PRODUCT_INDEX) -> Dict[int, List[Dict[str, Any]]]:
+    """Ürünlerin güncel kategorisinden farklı routing ile indekslenmiş kopyaları.
+
+    Kategorisi değişen ürünün eski kopyası eski routing'in shard'ında kalır;
+    routing'siz ids sorgusu tüm shard'lara gider ve her kopyanın _routing'ini
+    döndürür. Sadece routing açıkken anlamlıdır.
+    """
+    if not ES_ROUTE_BY_CATEGORY:
+        return {}
+    expected = {row.id: get_document_routing(row.category) for row in rows}
+    response = es.search(
+        index=index,
+        query={"ids": {"values": list(expected)}},
+        # Önceden oluşmuş çift kopyalar da bulunsun
+        size=len(expected) * 2,
+        source=False
+    )
+    copies: Dict[int, List[Dict[str, Any]]] = {}
+    for hit in response["hits"]["hits"]:
+        product_id = int(hit["_id"])
+        if hit.get("_routing") != expected.get(product_id):
+            copies.setdefault(product_id, []).append({"index": hit["_index"], "routing": hit.get("_routing")})
+    return copies
+
+def _build_copy_delete_action(product_id: int, copy: Dict[str, Any]) -> Dict[str, Any]:
+    action = {"_op_type": "delete", "_index": copy["index"], "_id": product_id}
+    if copy["routing"] is not None:
+        action["routing"] = copy["routing"]
+    return action
+
+def build_sync_actions(es: Elasticsearch, rows: List[Tuple], stats: Dict[str, int], index: str = PRODUCT_INDEX) -> List[Dict[str, Any]]:
+    """Değişen satırları sadece gerçekten gerekli bulk action'lara çevirir.
+
+    Kategorisi (dolayısıyla routing'i) değişen ürünlerin eski routing'deki
+    kopyaları da silinir; aksi halde tüm shard'lara giden aramalar aynı
+    ürünü iki kez döndürür.
+    """
+    indexed_hashes = fetch_indexed_hashes(es, rows, index)
+    misrouted = fetch_misrouted_copies(es, rows, index)
+    actions = []
+    for row in rows:
+        for copy in misrouted.get(row.id, []):
+            actions.append(_build_copy_delete_action(row.id, copy))
+            stats["rerouted"] += 1
+
+        if row.deleted_at is not None:
+            if row.id in indexed_hashes:
+                actions.append(build_product_delete_action(row.id, row.category, index=index))
+                stats["deleted"] += 1
+            else:
+                stats["skipped"] += 1
+            continue
+
+        action = build_product_action(*row[:7], index=index)
+        if indexed_hashes.get(row.id) == action["_source"]["content_hash"]:
+            stats["skipped"] += 1
+            continue
+        actions.append(action)
+        stats["upserted"] += 1
+    return actions
+
+def sync_products_incremental(batch_size: int = SYNC_BATCH_SIZE) -> Optional[Dict[str, Any]]:
+    """Son senkronizasyondan beri değişen ürünleri Elasticsearch'e yansıtır.
+
+    Süre katalog boyutuyla değil değişen satır sayısıyla orantılıdır.
+    Watermark sadece tüm action'lar başarılı olursa ilerletilir; hata
+    durumunda bir sonraki çalıştırma aynı noktadan devam eder.
+    """
+    es = get_es_client()
+    if not es:
+        print("Elasticsearch bağlantısı kurulamadı")
+        return None
+
+    with sync_lock():
+        return _sync_products_incremental(es, batch_size)
+
+def _sync_products_incremental(es: Elasticsearch, batch_size: int) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        since, since_id = load_watermark(db)
+        until = datetime.datetime.utcnow() - SYNC_SAFETY_LAG
+        print(f"Artımlı senkronizasyon: ({since}, {since_id}) -> {until}")
+
+        started_at = time.time()
+        stats = {"changed": 0, "upserted": 0, "deleted": 0, "rerouted": 0, "skipped": 0, "failed": 0}
+        last_row = None
+        loader = BulkLoader(es)
+
+        for rows in iter_changed_rows(db, since, since_id, until, batch_size):
+            stats["changed"] += len(rows)
+            actions = build_sync_actions(es, rows, stats)
+            if actions:
+                result = loader.run(actions)
+                stats["failed"] = result["failed"]
+                if result["failed"]:
+                    print(f"{result['failed']} ürün senkronize edilemedi, örnek hatalar: {result['errors']}")
+                    break
+            last_row = rows[-1]
+            # Her başarılı partiden sonra ilerlet; yarıda kesilirse baştan başlamaz
+            save_watermark(db, last_row.updated_at, last_row.id)
+
+        # Yeni eklenen ürünler herhangi bir aramaya girebileceğinden
+        # tek tek invalidation yerine arama cache nesli artırılır
+        if stats["upserted"] or stats["deleted"] or stats["rerouted"]:
+            CacheManager().bump_generation()
+
+        stats["seconds"] = round(time.time() - started_at, 2)
+        print(
+            f"Senkronizasyon bitti: {stats['changed']} değişiklik, {stats['upserted']} güncellendi, "
+            f"{stats['deleted']} silindi, {stats['rerouted']} eski routing kopyası silindi, {stats['skipped']} atlandı ({stats['seconds']} saniye)"
+        )
+        return stats
+
+    except Exception as e:
+        print(f"Artımlı senkronizasyon hatası: {e}")
+        return None
+    finally:
+        db.close()
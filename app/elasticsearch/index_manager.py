@@ -0,0 +1,137 @@
+from typing import List, Dict, Any, Optional, Tuple
+import datetime
+from elasticsearch import Elasticsearch
+from dotenv import load_dotenv
+import time
+import os
+from .es_client import build_product_mapping, get_profile_dynamic_settings, PRODUCT_INDEX
+from .query_builder import build_search_body
+from .cache_manager import CacheManager
+from .incremental_sync import rewind_watermark
+
+load_dotenv()
+
+# Sürümlü indeksler products_v1, products_v2, ... şeklinde adlandırılır;
+# aramalar her zaman "products" alias'ı üzerinden yapılır.
+INDEX_VERSION_PREFIX = f"{PRODUCT_INDEX}_v"
+ES_KEEP_INDEX_VERSIONS = int(os.getenv("ES_KEEP_INDEX_VERSIONS", "2"))
+ES_FORCE_MERGE_SEGMENTS = int(os.getenv("ES_FORCE_MERGE_SEGMENTS", "1"))
+ES_PUBLISH_TIMEOUT = os.getenv("ES_PUBLISH_TIMEOUT", "10m")
+
+# Alias değiştirilmeden önce yeni indekste çalıştırılan sorgular; segment'leri,
+# global ordinal'leri ve filter cache'i ısıtır.
+WARMUP_QUERIES: List[Tuple[str, Dict[str, Any]]] = [
+    ("*", {}),
+    ("*", {"max_price": 1000}),
+    ("*", {"category": "Ayakkabı"}),
+    ("*", {"brand": "Nike"}),
+    ("spor ayakkabı", {}),
+    ("laptop", {"max_price": 20000}),
+    ("telefon", {"brand": "Samsung"}),
+]
+
+def _parse_version(index_name: str) -> Optional[int]:
+    suffix = index_name[len(INDEX_VERSION_PREFIX):]
+    return int(suffix) if index_name.startswith(INDEX_VERSION_PREFIX) and suffix.isdigit() else None
+
+def list_index_versions(es: Elasticsearch) -> List[Tuple[int, str]]:
+    """Mevcut sürümlü indeksleri (sürüm, ad) olarak küçükten büyüğe döndürür"""
+    indices = es.indices.get(index=f"{INDEX_VERSION_PREFIX}*", expand_wildcards="open", allow_no_indices=True)
+    versions = []
+    for name in indices:
+        version = _parse_version(name)
+        if version is not None:
+            versions.append((version, name))
+    return sorted(versions)
+
+def get_alias_targets(es: Elasticsearch) -> List[str]:
+    """"products" alias'ının işaret ettiği indeksler"""
+    if not es.indices.exists_alias(name=PRODUCT_INDEX):
+        return []
+    return list(es.indices.get_alias(name=PRODUCT_INDEX).keys())
+
+def create_versioned_index(es: Elasticsearch, profile: Optional[str] = None) -> str:
+    """Bir sonraki sürüm numarasıyla, yükleme ayarlarında yeni bir indeks oluşturur"""
+    versions = list_index_versions(es)
+    next_version = versions[-1][0] + 1 if versions else 1
+    index_name = f"{INDEX_VERSION_PREFIX}{next_version}"
+    es.indices.create(index=index_name, body=build_product_mapping(profile, bulk_load=True))
+    print(f"{index_name} indeksi oluşturuldu")
+    return index_name
+
+def warmup_index(es: Elasticsearch, index_name: str, queries: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> None:
+    """Yeni indekste tipik sorguları çalıştırarak ilk gerçek isteklerdeki gecikmeyi önler"""
+    for query, filters in queries or WARMUP_QUERIES:
+        started_at = time.time()
+        try:
+            es.search(index=index_name, body=build_search_body(query, filters, 10, facets=True))
+            print(f"Warmup '{query}' {filters}: {(time.time() - started_at) * 1000:.0f} ms")
+        except Exception as e:
+            print(f"Warmup sorgu hatası ({query}): {e}")
+
+def swap_alias(es: Elasticsearch, index_name: str) -> None:
+    """"products" alias'ını tek atomik istekte yeni indekse taşır"""
+    actions: List[Dict[str, Any]] = [{"remove": {"index": target, "alias": PRODUCT_INDEX}} for target in get_alias_targets(es)]
+    # Eski kurulumlarda "products" alias değil gerçek bir indeks; aynı istekte kaldır
+    if es.indices.exists(index=PRODUCT_INDEX) and not es.indices.exists_alias(name=PRODUCT_INDEX):
+        actions.append({"remove_index": {"index": PRODUCT_INDEX}})
+    actions.append({"add": {"index": index_name, "alias": PRODUCT_INDEX}})
+    es.indices.update_aliases(actions=actions)
+    print(f"{PRODUCT_INDEX} alias'ı {index_name} indeksine taşındı")
+
+def prune_index_versions(es: Elasticsearch, keep: int = ES_KEEP_INDEX_VERSIONS) -> List[str]:
+    """En yeni `keep` sürüm ve alias'ın hedefi dışındaki eski indeksleri siler"""
+    active = set(get_alias_targets(es))
+    versions = list_index_versions(es)
+    stale = [name for _, name in versions[:-keep] if name not in active] if keep > 0 else []
+    for name in stale:
+        es.indices.delete(index=name)
+        print(f"Eski indeks silindi: {name}")
+    return stale
+
+def publish_index(
+    es: Elasticsearch,
+    index_name: str,
+    profile: Optional[str] = None,
+    loaded_since: Optional[datetime.datetime] = None
+) -> None:
+    """Yüklemesi biten indeksi hazırlayıp canlıya alır.
+
+    Sıra: refresh -> force merge (replika yokken, tek kopya üzerinde) ->
+    serving ayarları -> shard'lar yerleşene kadar bekle -> warmup ->
+    atomik alias değişimi -> senkronizasyon watermark'ını geri al ->
+    arama cache neslini artır -> eski sürümleri temizle.
+
+    loaded_since, yüklemenin başladığı an (UTC); verilirse bu andan sonra
+    değişen satırlar artımlı senkronizasyonla yeni indekse tekrar gönderilir.
+    """
+    es.indices.refresh(index=index_name)
+    es.options(request_timeout=3600).indices.forcemerge(
+        index=index_name,
+        max_num_segments=ES_FORCE_MERGE_SEGMENTS
+    )
+    es.indices.put_settings(index=index_name, body={"index": get_profile_dynamic_settings(profile)})
+    es.cluster.health(
+        index=index_name,
+        wait_for_status="yellow",
+        wait_for_no_initializing_shards=True,
+        wait_for_no_relocating_shards=True,
+        timeout=ES_PUBLISH_TIMEOUT
+    )
+    warmup_index(es, index_name)
+    swap_alias(es, index_name)
+    if loaded_since is not None:
+        # Yükleme sürerken sadece eski indekse yazılan değişiklikler kaybolmasın
+        rewind_watermark(loaded_since)
+    # Eski indeksten üretilmiş cache'lenmiş aramalar artık okunmaz
+    CacheManager().bump_generation()
+    prune_index_versions(es)
+
+def discard_index(es: Elasticsearch, index_name: str) -> None:
+    """Yarım kalan yüklemenin indeksini siler; alias eski indekste kalır"""
+    try:
+        if index_name not in get_alias_targets(es):
+            es.indices.delete(index=index_name, ignore_unavailable=True)
+            print(f"Tamamlanamayan indeks silindi: {index_name}")
+    except Exception as e:
+        print(f"İndeks silme hatası ({index_name}): {e}")
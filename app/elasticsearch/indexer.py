@@ -1,189 +1,512 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from ..database.database import SessionLocal
 from ..models.product import Product
-from .es_client import get_es_client, PRODUCT_INDEX, PRODUCT_MAPPING
-from .cache_manager import cache_search_results
+from .es_client import (
+    get_es_client,
+    get_async_es_client,
+    get_search_routing,
+    PRODUCT_INDEX
+)
+from .cache_manager import CacheManager, cache_search_results
+from .index_manager import create_versioned_index, publish_index, discard_index
+from .incremental_sync import SYNC_SAFETY_LAG
+from .bulk_throttle import build_default_throttle
+from .bulk_loader import (
+    BulkLoader,
+    build_product_action,
+    BULK_WORKERS,
+    BULK_CHUNK_SIZE,
+    BULK_MAX_CHUNK_BYTES
+)
+from .query_builder import (
+    MAX_PAGE_SIZE,
+    build_search_body,
+    is_browse_query,
+    parse_facet_aggregations,
+    SEARCH_TIER_EXACT,
+    SEARCH_TIER_FUZZY,
+    EXACT_TIER_TIMEOUT
+)
+from elasticsearch import NotFoundError
+from collections import Counter
 from datetime import timedelta
+import datetime
+import base64
+import json
+import os
 
 BATCH_SIZE = 1000
 
-def optimize_index():
-    """Elasticsearch index'ini optimize et"""
-    es = get_es_client()
-    if not es:
-        return False
+# Arama sonuçlarının cache'te kalma süresi. Yeniden indeksleme cache neslini
+# artırır ve fiyat güncellemeleri hit olarak dönen ürünleri düşürür; ancak fiyat
+# aralığı filtreli ve facet'li entry'ler bu süre boyunca eski fiyatı yansıtabilir
+SEARCH_CACHE_TTL = timedelta(seconds=int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600")))
 
-    try:
-        # Index ayarlarını optimize et
-        es.indices.put_settings(
-            index=PRODUCT_INDEX,
-            body={
-                "index": {
-                    "refresh_interval": "30s",
-                    "number_of_replicas": 0,
-                    "translog.durability": "async",
-                    "max_result_window": 50000
-                }
-            }
-        )
-        return True
-    except Exception as e:
-        print(f"Index optimizasyon hatası: {e}")
-        return False
+# Cursor tabanlı sayfalamada point-in-time'ın sayfalar arası yaşam süresi
+PIT_KEEP_ALIVE = os.getenv("SEARCH_PIT_KEEP_ALIVE", "1m")
+
+# İndekslenen kolonlar; sıra build_product_action parametreleriyle aynı
+PRODUCT_COLUMNS = (
+    Product.id,
+    Product.brand,
+    Product.model,
+    Product.price,
+    Product.category,
+    Product.target_audience,
+    Product.description
+)
 
-def bulk_index_products():
-    """Veritabanındaki ürünleri batch halinde Elasticsearch'e aktar"""
+def iter_product_rows(db, batch_size: int = BATCH_SIZE) -> Iterator[Tuple]:
+    """Ürünleri id üzerinden keyset pagination ile düz kolon tuple'ları olarak akıtır.
+
+    OFFSET'in aksine her sayfa primary key index'inden doğrudan başlar, ORM
+    nesnesi de oluşturulmaz.
+    """
+    last_id = 0
+    while True:
+        rows = db.query(*PRODUCT_COLUMNS)\
+            .filter(Product.id > last_id, Product.deleted_at.is_(None))\
+            .order_by(Product.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+def bulk_index_products(workers: int = BULK_WORKERS, chunk_size: int = BULK_CHUNK_SIZE, max_chunk_bytes: int = BULK_MAX_CHUNK_BYTES):
+    """Veritabanındaki ürünleri yeni bir sürümlü indekse yükleyip kesintisiz canlıya al
+
+    Yükleme products_v<N> indeksine yapılır; aramalar bu sırada eski indeksten
+    "products" alias'ı üzerinden yanıtlanmaya devam eder.
+    """
     es = get_es_client()
     if not es:
         print("Elasticsearch bağlantısı kurulamadı")
         return False
 
-    # İndeksi oluştur veya güncelle
-    if es.indices.exists(index=PRODUCT_INDEX):
-        es.indices.delete(index=PRODUCT_INDEX)
-    es.indices.create(index=PRODUCT_INDEX, body=PRODUCT_MAPPING)
-
-    # Optimize et
-    optimize_index()
+    # Yeni sürümü yükleme ayarlarıyla (refresh ve replika kapalı) oluştur
+    index_name = create_versioned_index(es)
+    # Okunan satırlar bu andan sonraki bir snapshot'tan; aradaki değişiklikler
+    # yayın sonrası artımlı senkronizasyonla tekrar gönderilir
+    loaded_since = datetime.datetime.utcnow() - SYNC_SAFETY_LAG
 
     # Veritabanından ürünleri al
     db = SessionLocal()
     try:
-        # Toplam ürün sayısını al
-        total_products = db.query(Product).count()
-        print(f"Toplam {total_products} ürün indexlenecek")
-
-        # Batch processing
-        offset = 0
-        while offset < total_products:
-            products = db.query(Product).offset(offset).limit(BATCH_SIZE).all()
-            if not products:
-                break
-
-            # Bulk data hazırla
-            bulk_data = []
-            for product in products:
-                # Index action
-                bulk_data.append({
-                    "index": {
-                        "_index": PRODUCT_INDEX,
-                        "_id": product.id
-                    }
-                })
-                # Document
-                bulk_data.append({
-                    "id": product.id,
-                    "brand": product.brand,
-                    "model": product.model,
-                    "price": product.price,
-                    "category": product.category,
-                    "target_audience": product.target_audience,
-                    "description": product.description,
-                    "suggest": {
-                        "input": [
-                            product.brand,
-                            product.model,
-                            product.category
-                        ]
-                    }
-                })
-
-            if bulk_data:
-                # Bulk indexing
-                es.bulk(operations=bulk_data, refresh=True)
-                print(f"{len(products)} ürün indexlendi (offset: {offset})")
+        loader = BulkLoader(es, workers=workers, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, throttle=build_default_throttle(es))
+        stats = loader.run(
+            build_product_action(*row, index=index_name) for row in iter_product_rows(db)
+        )
 
-            offset += BATCH_SIZE
+        if stats["failed"]:
+            print(f"{stats['failed']} ürün indexlenemedi, örnek hatalar: {stats['errors']}")
+            discard_index(es, index_name)
+            return False
 
-        print(f"Toplam {offset} ürün başarıyla indexlendi")
+        # Yükleme bitti: serving ayarları, force merge, warmup ve alias değişimi
+        publish_index(es, index_name, loaded_since=loaded_since)
         return True
 
     except Exception as e:
         print(f"Bulk indexing hatası: {e}")
+        discard_index(es, index_name)
         return False
     finally:
         db.close()
 
-@cache_search_results(ttl=timedelta(hours=1))
-def search_products(query: str, filters: Dict[str, Any] = None, size: int = 300000) -> List[Dict]:
+# Exact tier bu kadar sonuç döndürürse fuzzy sorguya geçilmez
+SEARCH_TIER_MIN_HITS = int(os.getenv("SEARCH_TIER_MIN_HITS", "3"))
+
+# Hangi kademenin sorguyu yanıtladığına dair sayaçlar (eşikleri ayarlamak için)
+search_tier_stats = Counter()
+
+def get_search_tier_stats() -> Dict[str, Any]:
+    """Kademeli arama istatistiklerini döndürür"""
+    return {
+        "tiers": dict(search_tier_stats),
+        "min_hits": SEARCH_TIER_MIN_HITS,
+        "exact_timeout": EXACT_TIER_TIMEOUT
+    }
+
+def _extract_suggestion(response: Dict) -> Optional[str]:
+    """Phrase suggester yanıtından en iyi öneriyi al"""
+    for entry in response.get("suggest", {}).get("did_you_mean", []):
+        for option in entry.get("options", []):
+            return option["text"]
+    return None
+
+@cache_search_results(ttl=SEARCH_CACHE_TTL)
+async def search_products_detailed(
+    query: str,
+    filters: Dict[str, Any] = None,
+    size: int = 10,
+    personalization: Optional[Dict[str, Any]] = None,
+    facets: bool = False
+) -> Dict[str, Any]:
     """
-    Elasticsearch'te ürün araması yapar
+    Kademeli ürün araması yapar ve sonuçla birlikte meta bilgileri döndürür
+
+    Metin sorgularında önce ucuz exact/phrase-prefix sorgusu çalışır; yeterli
+    sonuç gelmezse fuzzy sorguya geçilir. facets=True ise facet
+    aggregation'ları aynı istekte hesaplanır ve sonuçla birlikte cache'lenir.
+    Dönen sözlük:
+    {"hits": [...], "tier": "browse" | "exact" | "fuzzy", "suggestion": Optional[str],
+     "facets": Optional[Dict]}
+    Elasticsearch hatasında hit'ler boş döner ve "error" alanı eklenir.
     """
-    es = get_es_client()
-    if not es:
-        return []
+    es = get_async_es_client()
 
     # Query kontrolü
     if not query or not isinstance(query, str):
         query = "*"  # Eğer query None veya string değilse, tüm ürünleri getir
 
-    # Base query - multi_match ile arama
-    if query == "*":
-        must_conditions = [{"match_all": {}}]
-    else:
-        must_conditions = [{
-            "multi_match": {
-                "query": query,
-                "fields": ["brand^2", "model^2", "category", "description"],
-                "fuzziness": "AUTO",
-                "operator": "and"
-            }
-        }]
+    result = {"hits": [], "tier": None, "suggestion": None, "facets": None}
+    # Kategori filtreli sorgular sadece o kategorinin shard'ına gider
+    routing = get_search_routing(filters)
 
-    # Filtreleri ekle
-    if filters:
-        if filters.get("category"):
-            must_conditions.append({"term": {"category.keyword": filters["category"]}})
-        
-        if filters.get("brand"):
-            must_conditions.append({"term": {"brand.keyword": filters["brand"]}})
-        
-        if filters.get("target_audience"):
-            must_conditions.append({"term": {"target_audience.keyword": filters["target_audience"]}})
-        
-        # Fiyat filtresi
-        price_range = {}
-        if filters.get("min_price") is not None:
-            price_range["gte"] = float(filters["min_price"])
-        if filters.get("max_price") is not None:
-            price_range["lte"] = float(filters["max_price"])
-        
-        if price_range:
-            must_conditions.append({"range": {"price": price_range}})
+    try:
+        if is_browse_query(query):
+            body = build_search_body(query, filters, size, personalization, facets=facets)
+            print(f"[DEBUG] Elasticsearch query: {body['query']}")
+            # Sadece filtreden oluşan browse isteklerinde shard request cache'i kullan
+            response = await es.search(index=PRODUCT_INDEX, body=body, request_cache=True, routing=routing)
+            result["hits"] = [hit["_source"] for hit in response["hits"]["hits"]]
+            result["tier"] = "browse"
+        else:
+            body = build_search_body(query, filters, size, personalization, tier=SEARCH_TIER_EXACT, facets=facets)
+            print(f"[DEBUG] Elasticsearch query ({SEARCH_TIER_EXACT}): {body['query']}")
+            response = await es.search(index=PRODUCT_INDEX, body=body, routing=routing)
+            result["hits"] = [hit["_source"] for hit in response["hits"]["hits"]]
+            result["suggestion"] = _extract_suggestion(response)
+            result["tier"] = SEARCH_TIER_EXACT
+            if response.get("timed_out"):
+                search_tier_stats["exact_timed_out"] += 1
 
+            # Exact kademe yetersizse fuzzy sorguya geç
+            if len(result["hits"]) < min(SEARCH_TIER_MIN_HITS, size):
+                body = build_search_body(query, filters, size, personalization, tier=SEARCH_TIER_FUZZY, facets=facets)
+                print(f"[DEBUG] Elasticsearch query ({SEARCH_TIER_FUZZY}): {body['query']}")
+                response = await es.search(index=PRODUCT_INDEX, body=body, routing=routing)
+                result["hits"] = [hit["_source"] for hit in response["hits"]["hits"]]
+                result["tier"] = SEARCH_TIER_FUZZY
+
+        result["facets"] = parse_facet_aggregations(response.get("aggregations"))
+        search_tier_stats[result["tier"]] += 1
+        return result
+
+    except Exception as e:
+        print(f"Arama hatası: {e}")
+        # Hatalı sonuç cache'lenmez; bayat entry varsa o sunulmaya devam eder
+        result["error"] = str(e)
+        return result
+
+async def search_products(
+    query: str,
+    filters: Dict[str, Any] = None,
+    size: int = 10,
+    personalization: Optional[Dict[str, Any]] = None
+) -> List[Dict]:
+    """
+    Elasticsearch'te ürün araması yapar
+
+    personalization: {"preferred_brands": [...], "preferred_categories": [...]}
+    verilirse bu marka/kategorilerdeki ürünler sorgu içinde öne çıkarılır.
+    """
+    result = await search_products_detailed(
+        query=query,
+        filters=filters,
+        size=size,
+        personalization=personalization
+    )
+    return result["hits"]
+
+def encode_search_cursor(pit_id: Optional[str], sort_values: List[Any]) -> str:
+    """PIT id (henüz açılmadıysa None) ve son dökümanın sort değerlerini opak bir cursor'a çevirir"""
+    payload = json.dumps({"pit": pit_id, "sort": sort_values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_search_cursor(cursor: str) -> Dict[str, Any]:
+    """encode_search_cursor ile üretilmiş cursor'ı çözer"""
     try:
-        print(f"[DEBUG] Elasticsearch query: {must_conditions}")
-        response = es.search(
-            index=PRODUCT_INDEX,
-            body={
-                "query": {
-                    "bool": {
-                        "must": must_conditions
-                    }
-                },
-                "size": min(size, 100),  # Maksimum 100 sonuç getir
-                "sort": [
-                    {"_score": "desc"},
-                    {"price": "asc"}
-                ],
-                "_source": ["brand", "model", "price", "category", "description", "target_audience"]
-            }
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {"pit": payload["pit"], "sort": payload["sort"]}
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Geçersiz cursor")
+
+async def _search_first_page(
+    query: str,
+    filters: Optional[Dict[str, Any]],
+    first: int,
+    personalization: Optional[Dict[str, Any]],
+    facets: bool
+) -> Dict[str, Any]:
+    """PIT açmadan ilk sayfayı (ve istenirse facet'leri) tek istekte getirir.
+
+    Sonuç cache'lenebilir olsun diye hit'ler sadece _source olarak, skor ve
+    sort değerleri ayrı listelerde tutulur.
+    """
+    es = get_async_es_client()
+    first_page = {"hits": [], "scores": [], "sorts": [], "has_next_page": False, "total": 0, "facets": None}
+
+    # Sonraki sayfa olup olmadığını anlamak için bir fazla döküman iste
+    body = build_search_body(query, filters, first + 1, personalization, facets=facets)
+    body["sort"].append({"id": "asc"})
+    try:
+        response = await es.search(index=PRODUCT_INDEX, body=body, routing=get_search_routing(filters))
+    except Exception as e:
+        print(f"Sayfalı arama hatası: {e}")
+        first_page["error"] = str(e)
+        return first_page
+
+    hits = response["hits"]["hits"]
+    first_page["total"] = response["hits"]["total"]["value"]
+    first_page["facets"] = parse_facet_aggregations(response.get("aggregations"))
+    first_page["has_next_page"] = len(hits) > first
+    for hit in hits[:first]:
+        first_page["hits"].append(hit["_source"])
+        first_page["scores"].append(hit.get("_score") or 0.0)
+        first_page["sorts"].append(hit["sort"])
+    return first_page
+
+async def search_products_page(
+    query: str,
+    filters: Dict[str, Any] = None,
+    first: int = 20,
+    after: Optional[str] = None,
+    personalization: Optional[Dict[str, Any]] = None,
+    facets: bool = False
+) -> Dict[str, Any]:
+    """
+    Cursor tabanlı sayfalama yapar
+
+    İlk sayfa PIT'siz tek bir aramayla, facet'leri ile birlikte alınıp arama
+    cache'inde saklanır. Devamı varsa ilk sayfa sunulurken bir point-in-time
+    açılıp cursor'lara gömülür; sonraki sayfalar aynı PIT üzerinde son
+    dökümanın sort değerlerinden devam eder. İlk sayfa cache'ten ya da canlı
+    index'ten geldiği için snapshot'a dahil değildir: ilk sayfa ile PIT'in
+    açıldığı an arasında değişen ürünler 2. sayfada atlanabilir ya da
+    tekrarlanabilir. 2. sayfadan itibaren tüm sayfalar tutarlıdır. Eşit skor ve fiyatlarda
+    sıra `id` ile sabitlenir, böylece her sayfanın maliyeti derinlikten
+    bağımsızdır. Dönen sözlük:
+    {"edges": [{"cursor", "node"}], "has_next_page", "end_cursor", "total", "facets"}
+    """
+    es = get_async_es_client()
+
+    # Query kontrolü
+    if not query or not isinstance(query, str):
+        query = "*"
+
+    first = max(1, min(first, MAX_PAGE_SIZE))
+    page = {"edges": [], "has_next_page": False, "end_cursor": None, "total": 0, "facets": None}
+
+    if not after:
+        cache_mgr = CacheManager()
+        cache_key = cache_mgr.get_cache_key(query, filters, first, personalization, facets, mode="page")
+        first_page = await cache_mgr.get_or_load(
+            cache_key,
+            lambda: _search_first_page(query, filters, first, personalization, facets),
+            SEARCH_CACHE_TTL
         )
-        
-        return [hit["_source"] for hit in response["hits"]["hits"]]
+        if "error" in first_page:
+            # Boş sayfa "sonuç yok" gibi görünmesin; hata GraphQL'e yansısın
+            raise RuntimeError(f"Sayfalı arama hatası: {first_page['error']}")
+        page["total"] = first_page["total"]
+        page["facets"] = first_page["facets"]
+        page["has_next_page"] = first_page["has_next_page"]
+
+        pit_id = None
+        if page["has_next_page"]:
+            # Snapshot'ı ilk sayfa sunulurken başlat ki kullanıcının gördüğü
+            # sayfa ile 2. sayfa arasındaki pencere cache'in yaşıyla sınırlı kalsın.
+            # Routing PIT açılırken verilir; sonraki sayfalar aynı shard'larda kalır
+            try:
+                pit = await es.open_point_in_time(
+                    index=PRODUCT_INDEX,
+                    keep_alive=PIT_KEEP_ALIVE,
+                    routing=get_search_routing(filters)
+                )
+                pit_id = pit["id"]
+            except Exception as e:
+                # Sayfa yine sunulur; PIT 2. sayfa istendiğinde açılır
+                print(f"PIT açma hatası: {e}")
+
+        for source, score, sort_values in zip(first_page["hits"], first_page["scores"], first_page["sorts"]):
+            # Cache'teki nesneler paylaşıldığı için kopyası üzerinde çalış
+            node = dict(source)
+            node["score"] = score
+            page["edges"].append({"cursor": encode_search_cursor(pit_id, sort_values), "node": node})
+        if page["edges"]:
+            page["end_cursor"] = page["edges"][-1]["cursor"]
+        return page
+
+    cursor = decode_search_cursor(after)
+    pit_id, search_after = cursor["pit"], cursor["sort"]
+    opened_pit = False
+
+    try:
+        if pit_id is None:
+            # İlk sayfada PIT açılamamışsa burada açılır
+            pit = await es.open_point_in_time(
+                index=PRODUCT_INDEX,
+                keep_alive=PIT_KEEP_ALIVE,
+                routing=get_search_routing(filters)
+            )
+            pit_id = pit["id"]
+            opened_pit = True
 
+        # Sonraki sayfa olup olmadığını anlamak için bir fazla döküman iste
+        body = build_search_body(query, filters, first + 1, personalization)
+        body["sort"].append({"id": "asc"})
+        body["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+        body["search_after"] = search_after
+
+        response = await es.search(body=body)
     except Exception as e:
-        print(f"Arama hatası: {e}")
+        print(f"Sayfalı arama hatası: {e}")
+        if opened_pit:
+            # Bu çağrıda açılan PIT'i cursor'a hiç girmeden bırak
+            try:
+                await es.close_point_in_time(id=pit_id)
+            except Exception as close_error:
+                print(f"PIT kapatma hatası: {close_error}")
+        if isinstance(e, NotFoundError):
+            raise ValueError("Cursor süresi doldu, aramayı baştan başlatın")
+        # Boş sayfa + has_next_page=False sonuçların bittiği sanılmasın
+        raise
+
+    pit_id = response.get("pit_id", pit_id)
+    hits = response["hits"]["hits"]
+
+    page["total"] = response["hits"]["total"]["value"]
+    page["has_next_page"] = len(hits) > first
+    for hit in hits[:first]:
+        node = dict(hit["_source"])
+        node["score"] = hit.get("_score") or 0.0
+        page["edges"].append({
+            "cursor": encode_search_cursor(pit_id, hit["sort"]),
+            "node": node
+        })
+    if page["edges"]:
+        page["end_cursor"] = page["edges"][-1]["cursor"]
+
+    if not page["has_next_page"]:
+        # Son sayfada PIT'i hemen bırak
+        try:
+            await es.close_point_in_time(id=pit_id)
+        except Exception as e:
+            print(f"PIT kapatma hatası: {e}")
+
+    return page
+
+async def multi_search_products(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Birden fazla ürün aramasını cache'i de kullanarak tek bir _msearch isteğinde çalıştırır
+
+    requests: [{"query": ..., "filters": ..., "size": ..., "personalization": ..., "facets": ...}]
+    Her alt sorgu arama cache'inin get-or-load yolundan geçer: taze ve bayat
+    entry'ler Elasticsearch'e gitmeden döner (bayatlar arka planda yenilenir),
+    başka bir istekte yüklenmekte olan sorgu onu bekler. Kalan miss'ler ve
+    yenilemeler tek _msearch'te toplanır. Tek round trip'te tamamlanması için
+    aramalar fuzzy kademeyle çalışır. Sonuçlar aynı sırayla,
+    search_products_detailed formatında döner; hata veren alt sorgu sadece
+    kendi sonucunda "error" alanıyla işaretlenir, diğerlerini etkilemez.
+    """
+    if not requests:
         return []
 
-def get_suggestions(prefix: str, field: str = "suggest") -> List[str]:
+    cache_mgr = CacheManager()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    positions: List[int] = []
+    cache_keys: List[str] = []
+    # cache_keys ile aynı sırada: (_msearch header'ı, gövde, kademe)
+    searches: List[Tuple[Dict[str, Any], Dict[str, Any], str]] = []
+
+    for position, request in enumerate(requests):
+        query = request.get("query")
+        if not query or not isinstance(query, str):
+            query = "*"
+        try:
+            body = build_search_body(
+                query,
+                request.get("filters"),
+                request.get("size", 10),
+                request.get("personalization"),
+                facets=request.get("facets", False)
+            )
+        except (TypeError, ValueError) as e:
+            results[position] = {"hits": [], "tier": None, "suggestion": None, "facets": None, "error": str(e)}
+            continue
+
+        header = {"index": PRODUCT_INDEX}
+        if is_browse_query(query):
+            header["request_cache"] = True
+        routing = get_search_routing(request.get("filters"))
+        if routing:
+            header["routing"] = routing
+
+        positions.append(position)
+        cache_keys.append(cache_mgr.get_cache_key(
+            query,
+            request.get("filters"),
+            request.get("size", 10),
+            request.get("personalization"),
+            request.get("facets", False),
+            # Tek istekte fuzzy kademe çalıştığı için kademeli aramayla aynı entry'yi paylaşmaz
+            mode="msearch"
+        ))
+        searches.append((header, body, "browse" if is_browse_query(query) else SEARCH_TIER_FUZZY))
+
+    async def load(batch: List[int]) -> List[Dict[str, Any]]:
+        body = []
+        for index in batch:
+            body.extend(searches[index][:2])
+        es = get_async_es_client()
+        try:
+            response = await es.msearch(searches=body)
+            items = response["responses"]
+        except Exception as e:
+            print(f"Çoklu arama hatası: {e}")
+            items = [{"error": str(e)}] * len(batch)
+
+        loaded = []
+        for index, item in zip(batch, items):
+            if "error" in item:
+                # Hatalı sonuç cache'lenmez; bayat entry varsa o sunulmaya devam eder
+                print(f"Çoklu arama alt sorgu hatası: {item['error']}")
+                loaded.append({"hits": [], "tier": None, "suggestion": None, "facets": None, "error": str(item["error"])})
+                continue
+            tier = searches[index][2]
+            search_tier_stats[tier] += 1
+            loaded.append({
+                "hits": [hit["_source"] for hit in item["hits"]["hits"]],
+                "tier": tier,
+                "suggestion": None,
+                "facets": parse_facet_aggregations(item.get("aggregations"))
+            })
+        return loaded
+
+    if cache_keys:
+        cached = await cache_mgr.get_or_load_many(cache_keys, load, SEARCH_CACHE_TTL)
+        for position, result in zip(positions, cached):
+            results[position] = result
+
+    return results
+
+async def msearch_products(requests: List[Dict[str, Any]]) -> List[List[Dict]]:
+    """
+    multi_search_products'ın sadece hit listelerini döndüren kısa yolu
+
+    Hata veren aramalar boş liste olarak gelir.
+    """
+    return [result["hits"] for result in await multi_search_products(requests)]
+
+async def get_suggestions(prefix: str, field: str = "suggest") -> List[str]:
     """Otomatik tamamlama önerileri alır"""
-    es = get_es_client()
-    if not es:
-        return []
+    es = get_async_es_client()
 
     try:
-        response = es.search(
+        response = await es.search(
             index=PRODUCT_INDEX,
             body={
                 "suggest": {
@@ -0,0 +1,117 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+from collections import Counter, OrderedDict
+import threading
+import time
+
+# get() sonucu "bulunamadı" ile cache'lenmiş None'ı ayırmak için
+MISSING = object()
+
+class FrequencySketch:
+    """Anahtar erişim sıklığını sabit bellekle tahmin eden count-min sketch.
+
+    TinyLFU'daki gibi sayaçlar 15'te doyar ve `sample_size` kayıttan sonra
+    yarıya indirilir; böylece eskiden popüler olan anahtarlar zamanla unutulur.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width: int):
+        self.width = max(16, width)
+        self.sample_size = self.width * 10
+        self._rows = [[0] * self.width for _ in range(self.DEPTH)]
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        return [hash((seed, key)) % self.width for seed in range(self.DEPTH)]
+
+    def increment(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _reset(self) -> None:
+        for row in self._rows:
+            for index in range(self.width):
+                row[index] >>= 1
+        self._additions //= 2
+
+class L1Cache:
+    """Process içi, boyut ve süre sınırlı LRU cache (TinyLFU kabul politikalı).
+
+    Cache doluyken yeni bir anahtar, sadece tahmini erişim sıklığı LRU
+    sırasındaki kurbanınkinden yüksekse kabul edilir; tek seferlik sorgular
+    sık kullanılan sonuçları dışarı itemez.
+    Değerler kopyalanmadan paylaşılır; çağıranlar döndürülen nesneyi
+    değiştirmemelidir.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (son geçerlilik zamanı, değer, içerdiği ürün id'leri)
+        self._entries: "OrderedDict[str, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._sketch = FrequencySketch(max_entries)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Değeri döndürür; yoksa ya da süresi dolduysa MISSING"""
+        with self._lock:
+            self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, product_ids: Iterable[int] = (), ttl_seconds: Optional[float] = None) -> bool:
+        """Değeri kaydeder; kabul politikası reddederse False döner"""
+        ttl = min(self.ttl_seconds, ttl_seconds) if ttl_seconds else self.ttl_seconds
+        entry = (time.monotonic() + ttl, value, frozenset(product_ids))
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                return True
+
+            if len(self._entries) >= self.max_entries:
+                victim, (victim_expires, _, _) = next(iter(self._entries.items()))
+                if victim_expires > time.monotonic() and self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    self.stats["rejected"] += 1
+                    return False
+                del self._entries[victim]
+                self.stats["evicted"] += 1
+
+            self._entries[key] = entry
+            self.stats["admitted"] += 1
+            return True
+
+    def invalidate_products(self, product_ids: Iterable[int]) -> int:
+        """Verilen ürünlerden birini içeren entry'leri siler"""
+        product_ids = set(product_ids)
+        with self._lock:
+            stale = [key for key, (_, _, ids) in self._entries.items() if ids & product_ids]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds, **self.stats}
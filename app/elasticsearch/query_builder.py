@@ -0,0 +1,253 @@
+from typing import List, Dict, Any, Optional
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Arama yanıtında döndürülen alanlar
+SEARCH_SOURCE_FIELDS = ["id", "brand", "model", "price", "category", "description", "target_audience"]
+
+# Metin araması yapılan alanlar ve ağırlıkları
+SEARCH_TEXT_FIELDS = ["brand^2", "model^2", "category", "description"]
+
+# Tam eşleşme (term) filtresi uygulanan alanlar -> keyword alt alanları
+KEYWORD_FILTER_FIELDS = {
+    "category": "category.keyword",
+    "brand": "brand.keyword",
+    "target_audience": "target_audience.keyword",
+}
+
+# Tek istekte döndürülebilecek maksimum sonuç sayısı
+MAX_PAGE_SIZE = 100
+
+# Kademeli arama: önce ucuz exact/phrase-prefix sorgusu, yetersizse fuzzy
+SEARCH_TIER_EXACT = "exact"
+SEARCH_TIER_FUZZY = "fuzzy"
+EXACT_TIER_TIMEOUT = os.getenv("SEARCH_EXACT_TIMEOUT", "100ms")
+
+# "Bunu mu demek istediniz?" önerileri için shingle'lı alan
+SPELL_FIELD = "spell"
+
+# Arama sonuçlarıyla birlikte döndürülen facet'ler
+FACET_TERMS_FIELDS = {
+    "brands": "brand.keyword",
+    "categories": "category.keyword",
+    "target_audiences": "target_audience.keyword",
+}
+FACET_SIZE = int(os.getenv("SEARCH_FACET_SIZE", "20"))
+PRICE_HISTOGRAM_INTERVAL = float(os.getenv("SEARCH_PRICE_HISTOGRAM_INTERVAL", "500"))
+PRICE_PERCENTS = [5, 25, 50, 75, 95]
+
+# Kişiselleştirme ağırlıkları - tercih edilen marka/kategori skoru bu katsayılarla çarpılır
+PERSONALIZATION_BRAND_WEIGHT = float(os.getenv("PERSONALIZATION_BRAND_WEIGHT", "2.0"))
+PERSONALIZATION_CATEGORY_WEIGHT = float(os.getenv("PERSONALIZATION_CATEGORY_WEIGHT", "1.5"))
+
+def is_browse_query(query: Optional[str]) -> bool:
+    """Metin içermeyen, sadece filtrelerden oluşan (query == "*") istek mi?"""
+    return not query or not isinstance(query, str) or query == "*"
+
+def build_filter_clauses(filters: Optional[Dict[str, Any]]) -> List[Dict]:
+    """Skorlamaya katılmayan yapısal kısıtları filter context clause'larına çevirir.
+
+    Filter context'teki clause'lar skorlanmaz ve Elasticsearch node query
+    cache'inde tekrar kullanılabilir.
+    """
+    if not filters:
+        return []
+
+    clauses = []
+    for name, field in KEYWORD_FILTER_FIELDS.items():
+        if filters.get(name):
+            clauses.append({"term": {field: filters[name]}})
+
+    # Fiyat filtresi
+    price_range = {}
+    if filters.get("min_price") is not None:
+        price_range["gte"] = float(filters["min_price"])
+    if filters.get("max_price") is not None:
+        price_range["lte"] = float(filters["max_price"])
+    if price_range:
+        clauses.append({"range": {"price": price_range}})
+
+    return clauses
+
+def build_text_query(query: str, tier: str = SEARCH_TIER_FUZZY) -> Dict:
+    """Skorlanan metin sorgusu.
+
+    exact tier'ı fuzziness olmadan terim eşleşmesi ve marka/model üzerinde
+    phrase_prefix kullanır; fuzzy tier'ı en pahalı ama en toleranslı sorgudur.
+    """
+    if tier == SEARCH_TIER_EXACT:
+        return {
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": SEARCH_TEXT_FIELDS,
+                            "type": "cross_fields",
+                            "operator": "and"
+                        }
+                    },
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": ["brand^2", "model^2"],
+                            "type": "phrase_prefix"
+                        }
+                    }
+                ],
+                "minimum_should_match": 1
+            }
+        }
+
+    return {
+        "multi_match": {
+            "query": query,
+            "fields": SEARCH_TEXT_FIELDS,
+            "fuzziness": "AUTO",
+            "operator": "and"
+        }
+    }
+
+def build_phrase_suggester(query: str) -> Dict:
+    """Aynı istekte döndürülecek "bunu mu demek istediniz" phrase suggester'ı"""
+    return {
+        "did_you_mean": {
+            "text": query,
+            "phrase": {
+                "field": SPELL_FIELD,
+                "size": 1,
+                "gram_size": 3,
+                "direct_generator": [{"field": SPELL_FIELD, "suggest_mode": "popular"}],
+                "highlight": {"pre_tag": "", "post_tag": ""}
+            }
+        }
+    }
+
+def build_facet_aggregations() -> Dict:
+    """Marka/kategori/hedef kitle sayıları ve fiyat dağılımı aggregation'ları"""
+    aggs = {
+        name: {"terms": {"field": field, "size": FACET_SIZE}}
+        for name, field in FACET_TERMS_FIELDS.items()
+    }
+    aggs["price_histogram"] = {
+        "histogram": {"field": "price", "interval": PRICE_HISTOGRAM_INTERVAL, "min_doc_count": 1}
+    }
+    aggs["price_percentiles"] = {
+        "percentiles": {"field": "price", "percents": PRICE_PERCENTS}
+    }
+    return aggs
+
+def parse_facet_aggregations(aggregations: Optional[Dict]) -> Optional[Dict[str, Any]]:
+    """Aggregation yanıtını cache'lenebilir, sade bir sözlüğe çevirir"""
+    if not aggregations:
+        return None
+
+    facets = {
+        name: [
+            {"key": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get(name, {}).get("buckets", [])
+        ]
+        for name in FACET_TERMS_FIELDS
+    }
+    facets["price_histogram"] = [
+        {"key": bucket["key"], "count": bucket["doc_count"]}
+        for bucket in aggregations.get("price_histogram", {}).get("buckets", [])
+    ]
+    facets["price_percentiles"] = [
+        {"percent": float(percent), "value": value}
+        for percent, value in aggregations.get("price_percentiles", {}).get("values", {}).items()
+    ]
+    return facets
+
+def build_personalization_functions(personalization: Optional[Dict[str, Any]]) -> List[Dict]:
+    """Kullanıcı tercihlerini function_score fonksiyonlarına çevirir.
+
+    personalization: {"preferred_brands": [...], "preferred_categories": [...]}
+    """
+    if not personalization:
+        return []
+
+    functions = []
+    if personalization.get("preferred_brands"):
+        functions.append({
+            "filter": {"terms": {"brand.keyword": list(personalization["preferred_brands"])}},
+            "weight": PERSONALIZATION_BRAND_WEIGHT
+        })
+    if personalization.get("preferred_categories"):
+        functions.append({
+            "filter": {"terms": {"category.keyword": list(personalization["preferred_categories"])}},
+            "weight": PERSONALIZATION_CATEGORY_WEIGHT
+        })
+    return functions
+
+def build_search_query(
+    query: Optional[str],
+    filters: Optional[Dict[str, Any]] = None,
+    personalization: Optional[Dict[str, Any]] = None,
+    tier: str = SEARCH_TIER_FUZZY
+) -> Dict:
+    """Metin sorgusunu `must`, yapısal kısıtları `filter` altında birleştirir.
+
+    Kişiselleştirme verilmişse sorgu function_score ile sarılır; tercih edilen
+    marka ve kategoriler elenmez, sadece üst sıralara taşınır.
+    """
+    functions = build_personalization_functions(personalization)
+
+    bool_query: Dict[str, Any] = {"filter": build_filter_clauses(filters)}
+    if not is_browse_query(query):
+        bool_query["must"] = [build_text_query(query, tier)]
+    elif functions:
+        # Sadece filtreli sorgunun skoru 0'dır; çarpılabilir bir taban skor ver
+        bool_query["must"] = [{"match_all": {}}]
+
+    if not functions:
+        return {"bool": bool_query}
+
+    return {
+        "function_score": {
+            "query": {"bool": bool_query},
+            "functions": functions,
+            "score_mode": "multiply",
+            "boost_mode": "multiply"
+        }
+    }
+
+def build_search_body(
+    query: Optional[str],
+    filters: Optional[Dict[str, Any]] = None,
+    size: int = 10,
+    personalization: Optional[Dict[str, Any]] = None,
+    tier: str = SEARCH_TIER_FUZZY,
+    facets: bool = False
+) -> Dict:
+    """Ürün araması için tam istek gövdesini oluşturur.
+
+    facets=True ise facet aggregation'ları aynı isteğe eklenir.
+    """
+    if is_browse_query(query) and not build_personalization_functions(personalization):
+        # Sadece filtre varken skor sabittir, doğrudan fiyata göre sırala
+        sort = [{"price": "asc"}]
+    else:
+        sort = [{"_score": "desc"}, {"price": "asc"}]
+
+    body = {
+        "query": build_search_query(query, filters, personalization, tier),
+        "size": min(size, MAX_PAGE_SIZE),
+        "sort": sort,
+        "_source": SEARCH_SOURCE_FIELDS
+    }
+
+    if facets:
+        body["aggs"] = build_facet_aggregations()
+
+    if tier == SEARCH_TIER_EXACT and not is_browse_query(query):
+        # Ucuz ilk kademe: süre sınırlı, öneri de aynı yanıtta gelir.
+        # terminate_after kullanılmaz: indeks fiyata göre sıralı olduğundan
+        # shard'lar en ucuz N eşleşmede durur, skora göre sonuçlar ucuz
+        # ürünlere kayar ve toplam eksik sayılır
+        body["timeout"] = EXACT_TIER_TIMEOUT
+        body["suggest"] = build_phrase_suggester(query)
+
+    return body
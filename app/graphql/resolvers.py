@@ -2,10 +2,25 @@ from typing import List, Optional
 import strawberry
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from ..schemas.product import Product, ProductFilter, ProductStats, SearchResult, SearchFilter
+from ..schemas.product import (
+    Product,
+    ProductFilter,
+    ProductStats,
+    SearchResult,
+    SearchFilter,
+    PageInfo,
+    SearchResultEdge,
+    SearchResultConnection,
+    SearchFacets,
+    FacetBucket,
+    PriceBucket,
+    PricePercentile,
+    SearchInput,
+    MultiSearchResult
+)
 from ..models.product import Product as ProductModel
 from ..database.database import get_db
-from ..elasticsearch.indexer import search_products, get_suggestions
+from ..elasticsearch.indexer import search_products_page, multi_search_products, get_suggestions
 
 def get_db_context():
     db = next(get_db())
@@ -14,47 +29,120 @@ def get_db_context():
     finally:
         db.close()
 
+# Tek multiSearch isteğinde kabul edilen en fazla alt sorgu
+MAX_MULTI_SEARCH_QUERIES = 50
+
+def search_filter_to_dict(filter: Optional[SearchFilter]) -> dict:
+    """GraphQL SearchFilter girdisini search_products filtre sözlüğüne çevirir"""
+    filters = {}
+    if filter:
+        if filter.category:
+            filters["category"] = filter.category
+        if filter.brand:
+            filters["brand"] = filter.brand
+        if filter.target_audience:
+            filters["target_audience"] = filter.target_audience
+        if filter.min_price is not None:
+            filters["min_price"] = filter.min_price
+        if filter.max_price is not None:
+            filters["max_price"] = filter.max_price
+    return filters
+
+def to_search_result(source: dict) -> SearchResult:
+    """Elasticsearch dökümanını SearchResult tipine çevirir"""
+    return SearchResult(
+        id=source.get("id", 0),
+        brand=source["brand"],
+        model=source["model"],
+        price=source["price"],
+        category=source["category"],
+        target_audience=source["target_audience"],
+        description=source["description"],
+        score=source.get("score", 0.0)
+    )
+
+async def run_multi_search(queries: List[SearchInput]) -> List[MultiSearchResult]:
+    """Alt sorguları tek _msearch ile çalıştırır; her sonuç kendi hatasını taşır"""
+    if len(queries) > MAX_MULTI_SEARCH_QUERIES:
+        raise ValueError(f"En fazla {MAX_MULTI_SEARCH_QUERIES} sorgu gönderilebilir")
+
+    requests = [
+        {
+            "query": search_input.query,
+            "filters": search_filter_to_dict(search_input.filter),
+            "size": search_input.size,
+            "facets": search_input.facets
+        }
+        for search_input in queries
+    ]
+    results = await multi_search_products(requests)
+    return [
+        MultiSearchResult(
+            results=[to_search_result(hit) for hit in result["hits"]],
+            facets=build_search_facets(result.get("facets")),
+            error=result.get("error")
+        )
+        for result in results
+    ]
+
+def build_search_facets(facets: Optional[dict]) -> Optional[SearchFacets]:
+    """Facet sözlüğünü GraphQL tipine çevirir"""
+    if not facets:
+        return None
+    return SearchFacets(
+        brands=[FacetBucket(key=b["key"], count=b["count"]) for b in facets["brands"]],
+        categories=[FacetBucket(key=b["key"], count=b["count"]) for b in facets["categories"]],
+        target_audiences=[FacetBucket(key=b["key"], count=b["count"]) for b in facets["target_audiences"]],
+        price_histogram=[PriceBucket(key=b["key"], count=b["count"]) for b in facets["price_histogram"]],
+        price_percentiles=[PricePercentile(percent=p["percent"], value=p["value"]) for p in facets["price_percentiles"]]
+    )
+
+def build_search_connection(page: dict) -> SearchResultConnection:
+    """search_products_page sonucunu GraphQL connection tipine çevirir"""
+    return SearchResultConnection(
+        edges=[
+            SearchResultEdge(cursor=edge["cursor"], node=to_search_result(edge["node"]))
+            for edge in page["edges"]
+        ],
+        page_info=PageInfo(
+            has_next_page=page["has_next_page"],
+            end_cursor=page["end_cursor"]
+        ),
+        total_count=page["total"],
+        facets=build_search_facets(page.get("facets"))
+    )
+
 @strawberry.type
 class Query:
     @strawberry.field
-    def search(self, query: str, filter: Optional[SearchFilter] = None) -> List[SearchResult]:
-        """Elasticsearch ile ürün araması yapar"""
-        filters = {}
-        if filter:
-            if filter.category:
-                filters["category"] = filter.category
-            if filter.brand:
-                filters["brand"] = filter.brand
-            if filter.target_audience:
-                filters["target_audience"] = filter.target_audience
-            if filter.min_price is not None and filter.max_price is not None:
-                filters["price_range"] = (filter.min_price, filter.max_price)
-        
-        results = search_products(query, filters)
-        return [
-            SearchResult(
-                id=result["id"],
-                brand=result["brand"],
-                model=result["model"],
-                price=result["price"],
-                category=result["category"],
-                target_audience=result["target_audience"],
-                description=result["description"],
-                score=result.get("score", 0.0)
-            )
-            for result in results
-        ]
+    async def search(
+        self,
+        query: str,
+        filter: Optional[SearchFilter] = None,
+        first: int = 20,
+        after: Optional[str] = None,
+        facets: bool = False
+    ) -> SearchResultConnection:
+        """Elasticsearch ile cursor tabanlı ürün araması yapar; istenirse facet'leri de döndürür"""
+        filters = search_filter_to_dict(filter)
+        page = await search_products_page(query=query, filters=filters, first=first, after=after, facets=facets)
+        return build_search_connection(page)
+
+    @strawberry.field
+    async def multi_search(self, queries: List[SearchInput]) -> List[MultiSearchResult]:
+        """Birden fazla aramayı tek Elasticsearch round trip'inde çalıştırır"""
+        return await run_multi_search(queries)
 
     @strawberry.field
-    def suggest(self, prefix: str) -> List[str]:
+    async def suggest(self, prefix: str) -> List[str]:
         """Otomatik tamamlama önerileri döndürür"""
-        return get_suggestions(prefix)
+        return await get_suggestions(prefix)
 
     @strawberry.field
     def products(self, filter: Optional[ProductFilter] = None) -> List[Product]:
         """PostgreSQL'den ürün listesi döndürür"""
         db = next(get_db_context())
-        query = db.query(ProductModel)
+        query = db.query(ProductModel).filter(ProductModel.deleted_at.is_(None))
         
         if filter:
             if filter.brand:
@@ -73,7 +161,7 @@ class Query:
     @strawberry.field
     def product(self, id: int) -> Optional[Product]:
         db = next(get_db_context())
-        return db.query(ProductModel).filter(ProductModel.id == id).first()
+        return db.query(ProductModel).filter(ProductModel.id == id, ProductModel.deleted_at.is_(None)).first()
 
     @strawberry.field
     def product_stats(self) -> List[ProductStats]:
@@ -85,7 +173,7 @@ class Query:
             func.avg(ProductModel.price).label('avg_price'),
             func.min(ProductModel.price).label('min_price'),
             func.max(ProductModel.price).label('max_price')
-        ).group_by(ProductModel.category).all()
+        ).filter(ProductModel.deleted_at.is_(None)).group_by(ProductModel.category).all()
         
         return [
             ProductStats(
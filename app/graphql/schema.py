@@ -1,19 +1,12 @@
 import strawberry
 from typing import List, Optional
 from ..models.product import Product as ProductModel
-from ..elasticsearch.es_client import get_es_client, PRODUCT_INDEX
+from ..schemas.product import Product, SearchResultConnection, SearchInput, MultiSearchResult
+from ..elasticsearch.es_client import get_async_es_client, PRODUCT_INDEX
+from ..elasticsearch.indexer import search_products_page
+from .resolvers import build_search_connection, run_multi_search
 from elasticsearch import NotFoundError
 
-@strawberry.type
-class Product:
-    id: int
-    brand: str
-    model: str
-    price: float
-    category: str
-    target_audience: str
-    description: str
-
 @strawberry.type
 class ProductSuggestions:
     suggestions: List[str]
@@ -26,82 +19,37 @@ class Query:
         pass
 
     @strawberry.field
-    def search_products(
+    async def search_products(
         self, 
         query: str,
         category: Optional[str] = None,
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
-        limit: int = 20
-    ) -> List[Product]:
-        es = get_es_client()
-        if not es:
-            return []
+        first: int = 20,
+        after: Optional[str] = None,
+        facets: bool = False
+    ) -> SearchResultConnection:
+        # Yapısal kısıtlar filter context'te, sayfalama PIT + search_after ile
+        filters = {
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price
+        }
 
-        # Build search query
-        must_conditions = [{
-            "multi_match": {
-                "query": query,
-                "fields": ["brand^2", "model^2", "category", "description"],
-                "fuzziness": "AUTO"
-            }
-        }]
+        page = await search_products_page(query=query, filters=filters, first=first, after=after, facets=facets)
+        return build_search_connection(page)
 
-        # Add filters if provided
-        if category:
-            must_conditions.append({"term": {"category": category}})
-        
-        range_filter = {}
-        if min_price is not None:
-            range_filter["gte"] = min_price
-        if max_price is not None:
-            range_filter["lte"] = max_price
-        
-        if range_filter:
-            must_conditions.append({"range": {"price": range_filter}})
-
-        # Execute search
-        try:
-            response = es.search(
-                index=PRODUCT_INDEX,
-                body={
-                    "query": {
-                        "bool": {
-                            "must": must_conditions
-                        }
-                    },
-                    "size": limit
-                }
-            )
-            
-            # Convert results to Product types
-            products = []
-            for hit in response["hits"]["hits"]:
-                source = hit["_source"]
-                products.append(
-                    Product(
-                        id=source.get("id", 0),
-                        brand=source["brand"],
-                        model=source["model"],
-                        price=source["price"],
-                        category=source["category"],
-                        target_audience=source["target_audience"],
-                        description=source["description"]
-                    )
-                )
-            return products
-        except Exception as e:
-            print(f"Search error: {e}")
-            return []
+    @strawberry.field
+    async def multi_search(self, queries: List[SearchInput]) -> List[MultiSearchResult]:
+        """Birden fazla aramayı tek _msearch ile çalıştırır; cache'teki sorgular Elasticsearch'e gitmez"""
+        return await run_multi_search(queries)
 
     @strawberry.field
-    def suggest_products(self, prefix: str, limit: int = 5) -> ProductSuggestions:
-        es = get_es_client()
-        if not es:
-            return ProductSuggestions(suggestions=[])
+    async def suggest_products(self, prefix: str, limit: int = 5) -> ProductSuggestions:
+        es = get_async_es_client()
 
         try:
-            response = es.search(
+            response = await es.search(
                 index=PRODUCT_INDEX,
                 body={
                     "suggest": {
@@ -5,6 +5,11 @@ from fastapi.staticfiles import StaticFiles
 from strawberry.fastapi import GraphQLRouter
 from app.graphql.schema import schema
 from app.database.database import engine, Base, SessionLocal
+from app.database.migrations import add_product_change_tracking
+from app.elasticsearch.es_client import init_async_es_client, close_async_es_client
+from app.elasticsearch.indexer import get_search_tier_stats
+from app.elasticsearch.cache_manager import CacheManager
+from app.services.price_service import apply_price_updates
 from dotenv import load_dotenv
 import os
 from slowapi import Limiter
@@ -13,24 +18,35 @@ from slowapi.errors import RateLimitExceeded
 import json
 from app.agent.shopping_assistant import ShoppingAssistant
 from app.models.user_preferences import UserPreferencesManager
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List
 from fastapi.security import OAuth2PasswordBearer
+from contextlib import asynccontextmanager
 
 # Load environment variables
 load_dotenv()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+# create_all var olan products tablosuna yeni kolonları eklemez
+add_product_change_tracking()
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Elasticsearch bağlantı havuzunu uygulama ömrü boyunca paylaş
+    await init_async_es_client()
+    yield
+    await close_async_es_client()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Product Search API",
     description="A FastAPI application with GraphQL, Elasticsearch, and PostgreSQL",
     version="1.0.0",
-    debug=os.getenv("DEBUG", "False").lower() == "true"
+    debug=os.getenv("DEBUG", "False").lower() == "true",
+    lifespan=lifespan
 )
 
 # Add rate limiter
@@ -160,6 +176,30 @@ async def get_preferences_analysis(
     analysis = prefs_manager.analyze_user_preferences(user_id)
     return analysis
 
+@app.post("/products/prices")
+def update_product_prices(updates: List[Dict[str, Any]]):
+    """
+    Toplu fiyat güncellemesi (veritabanı, Elasticsearch ve ilgili cache entry'leri)
+    
+    Request body:
+    [{"id": 42, "price": 1299.90}, ...]
+    """
+    try:
+        pairs = [(update["id"], update["price"]) for update in updates]
+    except (KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Each update needs id and price fields")
+    
+    try:
+        return apply_price_updates(pairs)
+    except Exception as e:
+        print(f"Fiyat güncelleme hatası: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update prices")
+
+@app.get("/search/stats")
+async def search_stats():
+    """Arama kademelerinin (browse/exact/fuzzy) ve cache katmanlarının sayaçlarını getir"""
+    return {**get_search_tier_stats(), "cache": CacheManager().get_stats()}
+
 # Health check endpoint
 @app.get("/health")
 @limiter.limit("10/minute")
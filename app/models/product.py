@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index
 from ..database.database import Base
+import datetime
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Artımlı senkronizasyon (updated_at, id) sırasıyla okur
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     brand = Column(String(100), index=True)
@@ -10,4 +15,7 @@ class Product(Base):
     category = Column(String(100), index=True)
     model = Column(String(200))
     target_audience = Column(String(100))
-    description = Column(Text) 
\ No newline at end of file
+    description = Column(Text)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
+    # Silinen ürünler satır olarak kalır ki senkronizasyon Elasticsearch'ten de silebilsin
+    deleted_at = Column(DateTime, nullable=True)
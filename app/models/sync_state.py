@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..database.database import Base
+import datetime
+
+class SyncState(Base):
+    """Artımlı senkronizasyonun kaldığı yer (high-water mark).
+
+    (last_updated_at, last_id) çifti işlenen son satırı gösterir; aynı
+    updated_at değerine sahip satırlar id ile ayrılır.
+    """
+    __tablename__ = "sync_state"
+
+    name = Column(String(100), primary_key=True)
+    last_updated_at = Column(DateTime, nullable=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    synced_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -16,6 +16,46 @@ class Product:
 class SearchResult(Product):
     score: float
 
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: Optional[str] = None
+
+@strawberry.type
+class SearchResultEdge:
+    cursor: str
+    node: SearchResult
+
+@strawberry.type
+class FacetBucket:
+    key: str
+    count: int
+
+@strawberry.type
+class PriceBucket:
+    key: float
+    count: int
+
+@strawberry.type
+class PricePercentile:
+    percent: float
+    value: Optional[float] = None
+
+@strawberry.type
+class SearchFacets:
+    brands: List[FacetBucket]
+    categories: List[FacetBucket]
+    target_audiences: List[FacetBucket]
+    price_histogram: List[PriceBucket]
+    price_percentiles: List[PricePercentile]
+
+@strawberry.type
+class SearchResultConnection:
+    edges: List[SearchResultEdge]
+    page_info: PageInfo
+    total_count: int
+    facets: Optional[SearchFacets] = None
+
 @strawberry.input
 class SearchFilter:
     category: Optional[str] = None
@@ -24,6 +64,13 @@ class SearchFilter:
     min_price: Optional[float] = None
     max_price: Optional[float] = None
 
+@strawberry.input
+class SearchInput:
+    query: str
+    filter: Optional[SearchFilter] = None
+    size: int = 10
+    facets: bool = False
+
 @strawberry.input
 class ProductFilter:
     brand: Optional[str] = None
@@ -38,4 +85,10 @@ class ProductStats:
     count: int
     avg_price: float
     min_price: float
-    max_price: float 
\ No newline at end of file
+    max_price: float
+
+@strawberry.type
+class MultiSearchResult:
+    results: List[SearchResult]
+    facets: Optional[SearchFacets] = None
+    error: Optional[str] = None
@@ -2,8 +2,13 @@ from faker import Faker
 import random
 from datetime import datetime, timedelta
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from multiprocessing import Pool
 import numpy as np
+import orjson
+import shutil
+import time
+import os
 
 fake = Faker(['tr_TR'])
 
@@ -66,30 +71,33 @@ CATEGORIES = {
 # Hedef kitle seçenekleri
 TARGET_AUDIENCES = ["Erkek", "Kadın", "Unisex", "Çocuk", "Genç", "Yetişkin"]
 
+# Kategori bazında açıklamalarda kullanılan özellikler
+CATEGORY_FEATURES = {
+    "Elektronik": [
+        "yüksek performanslı", "enerji verimli", "akıllı", "yenilikçi", "kompakt",
+        "kullanıcı dostu", "dayanıklı", "premium", "profesyonel", "taşınabilir"
+    ],
+    "Moda": [
+        "şık", "rahat", "modern", "klasik", "sportif", "zarif", "dayanıklı",
+        "hafif", "nefes alabilen", "su geçirmez"
+    ],
+    "Ev & Yaşam": [
+        "fonksiyonel", "şık", "dayanıklı", "modern", "ergonomik", "pratik",
+        "enerji tasarruflu", "kompakt", "çok amaçlı", "dekoratif"
+    ],
+    "Kitap & Hobi": [
+        "eğitici", "eğlenceli", "yaratıcı", "ilham verici", "kaliteli",
+        "profesyonel", "başlangıç seviyesi", "gelişmiş", "popüler", "klasik"
+    ],
+    "Spor & Outdoor": [
+        "profesyonel", "dayanıklı", "hafif", "su geçirmez", "nefes alabilen",
+        "ergonomik", "yüksek performanslı", "kompakt", "çok yönlü", "güvenli"
+    ]
+}
+
 def generate_description(category: str, subcategory: str, brand: str, model: str) -> str:
     """Ürün için gerçekçi açıklama oluştur"""
-    features = {
-        "Elektronik": [
-            "yüksek performanslı", "enerji verimli", "akıllı", "yenilikçi", "kompakt",
-            "kullanıcı dostu", "dayanıklı", "premium", "profesyonel", "taşınabilir"
-        ],
-        "Moda": [
-            "şık", "rahat", "modern", "klasik", "sportif", "zarif", "dayanıklı",
-            "hafif", "nefes alabilen", "su geçirmez"
-        ],
-        "Ev & Yaşam": [
-            "fonksiyonel", "şık", "dayanıklı", "modern", "ergonomik", "pratik",
-            "enerji tasarruflu", "kompakt", "çok amaçlı", "dekoratif"
-        ],
-        "Kitap & Hobi": [
-            "eğitici", "eğlenceli", "yaratıcı", "ilham verici", "kaliteli",
-            "profesyonel", "başlangıç seviyesi", "gelişmiş", "popüler", "klasik"
-        ],
-        "Spor & Outdoor": [
-            "profesyonel", "dayanıklı", "hafif", "su geçirmez", "nefes alabilen",
-            "ergonomik", "yüksek performanslı", "kompakt", "çok yönlü", "güvenli"
-        ]
-    }
+    features = CATEGORY_FEATURES
     
     category_features = features.get(category, features["Elektronik"])
     selected_features = random.sample(category_features, 3)
@@ -159,11 +167,173 @@ def save_products(products: List[Dict], filename: str = "products.json"):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(products, f, ensure_ascii=False, indent=2)
 
+# Toplu (vektörel) üretim için düz tablolar: kategori -> alt kategori -> marka
+_CATEGORY_NAMES = list(CATEGORIES.keys())
+_SUBCATEGORY_NAMES = [sub for cat in _CATEGORY_NAMES for sub in CATEGORIES[cat]["subcategories"]]
+_SUBCATEGORY_LOWER = [sub.lower() for sub in _SUBCATEGORY_NAMES]
+_SUB_COUNT = np.array([len(CATEGORIES[cat]["subcategories"]) for cat in _CATEGORY_NAMES])
+_SUB_OFFSET = np.concatenate(([0], np.cumsum(_SUB_COUNT)[:-1]))
+_BRAND_NAMES = [
+    brand
+    for cat in _CATEGORY_NAMES
+    for brands in CATEGORIES[cat]["subcategories"].values()
+    for brand in brands
+]
+_BRAND_COUNT = np.array([
+    len(brands) for cat in _CATEGORY_NAMES for brands in CATEGORIES[cat]["subcategories"].values()
+])
+_BRAND_OFFSET = np.concatenate(([0], np.cumsum(_BRAND_COUNT)[:-1]))
+_PRICE_MIN = np.array([CATEGORIES[cat]["price_range"][0] for cat in _CATEGORY_NAMES], dtype=float)
+_PRICE_MAX = np.array([CATEGORIES[cat]["price_range"][1] for cat in _CATEGORY_NAMES], dtype=float)
+_PRICE_MU = np.log((_PRICE_MIN + _PRICE_MAX) / 2)
+_FEATURES = [CATEGORY_FEATURES.get(cat, CATEGORY_FEATURES["Elektronik"]) for cat in _CATEGORY_NAMES]
+_FEATURE_COUNT = min(len(features) for features in _FEATURES)
+
+# generate_description ve generate_model_name ile aynı kalıplar
+_DESCRIPTION_TEMPLATES = [
+    "{brand} {model}, {f0}, {f1}, {f2} özellikleriyle öne çıkan bir üründür.",
+    "Bu {sub}, {f0} tasarımı ve {f1} yapısıyla dikkat çeker.",
+    "{brand}'ın en yeni {sub} modeli {model}, {f0} ve {f1} özellikleriyle kullanıcıların beğenisini kazanıyor.",
+    "Yenilikçi özellikleriyle öne çıkan {brand} {model}, {f0} yapısı ve {f1} tasarımıyla {sub} kategorisinde fark yaratıyor."
+]
+_MODEL_TEMPLATES = ["{w}-{n4}", "{l}{n2}{x}", "{v}-{n3}", "{year}-{l}{n2}"]
+_MODEL_WORDS = ["Pro", "Lite", "Plus", "Max", "Ultra"]
+_MODEL_VERSIONS = ["Neo", "Air", "Smart", "Elite"]
+_MODEL_SUFFIXES = ["X", "S", "E", "T"]
+_LETTERS = [chr(code) for code in range(ord("A"), ord("Z") + 1)]
+
+# Bir shard tek parçada üretilir; bellek kullanımı shard boyutuyla sınırlı
+GENERATOR_SHARD_SIZE = 100_000
+
+def generate_product_block(rng: np.random.Generator, count: int, start_id: int = 1) -> List[Dict]:
+    """count ürünü tüm rastgele seçimleri NumPy dizileriyle tek seferde yaparak üretir.
+
+    Dağılımlar generate_products ile aynıdır (kategori, alt kategori ve marka
+    düzgün; fiyat kategori başına log-normal), ama Faker ve ürün başına
+    random çağrısı yoktur. id'ler start_id'den ardışık verilir.
+    """
+    cat_idx = rng.integers(len(_CATEGORY_NAMES), size=count)
+    sub_idx = _SUB_OFFSET[cat_idx] + (rng.random(count) * _SUB_COUNT[cat_idx]).astype(np.int64)
+    brand_idx = _BRAND_OFFSET[sub_idx] + (rng.random(count) * _BRAND_COUNT[sub_idx]).astype(np.int64)
+    audience_idx = rng.integers(len(TARGET_AUDIENCES), size=count)
+
+    prices = rng.lognormal(_PRICE_MU[cat_idx], 0.5)
+    prices = np.round(np.clip(prices, _PRICE_MIN[cat_idx], _PRICE_MAX[cat_idx]), 2)
+
+    # Her ürün için kategorisinin özelliklerinden tekrarsız 3 tane
+    feature_idx = np.argsort(rng.random((count, _FEATURE_COUNT)), axis=1)[:, :3]
+    description_idx = rng.integers(len(_DESCRIPTION_TEMPLATES), size=count)
+
+    model_idx = rng.integers(len(_MODEL_TEMPLATES), size=count)
+    words = rng.integers(len(_MODEL_WORDS), size=count)
+    versions = rng.integers(len(_MODEL_VERSIONS), size=count)
+    suffixes = rng.integers(len(_MODEL_SUFFIXES), size=count)
+    letters = rng.integers(len(_LETTERS), size=count)
+    n2 = rng.integers(10, 100, size=count)
+    n3 = rng.integers(100, 1000, size=count)
+    n4 = rng.integers(1000, 10000, size=count)
+    year = datetime.now().year
+
+    # Döngüde NumPy skaler erişimi yavaş; dizileri bir kez Python listesine çevir
+    cat_idx, sub_idx, brand_idx, audience_idx = cat_idx.tolist(), sub_idx.tolist(), brand_idx.tolist(), audience_idx.tolist()
+    prices, feature_idx, description_idx = prices.tolist(), feature_idx.tolist(), description_idx.tolist()
+    model_idx, words, versions, suffixes, letters = (
+        model_idx.tolist(), words.tolist(), versions.tolist(), suffixes.tolist(), letters.tolist()
+    )
+    n2, n3, n4 = n2.tolist(), n3.tolist(), n4.tolist()
+
+    products = []
+    for i in range(count):
+        sub = sub_idx[i]
+        brand = _BRAND_NAMES[brand_idx[i]]
+        model = _MODEL_TEMPLATES[model_idx[i]].format(
+            w=_MODEL_WORDS[words[i]],
+            v=_MODEL_VERSIONS[versions[i]],
+            x=_MODEL_SUFFIXES[suffixes[i]],
+            l=_LETTERS[letters[i]],
+            n2=n2[i],
+            n3=n3[i],
+            n4=n4[i],
+            year=year
+        )
+        features = _FEATURES[cat_idx[i]]
+        f0, f1, f2 = feature_idx[i]
+        products.append({
+            "id": start_id + i,
+            "brand": brand,
+            "model": model,
+            "price": prices[i],
+            "category": _SUBCATEGORY_NAMES[sub],
+            "target_audience": TARGET_AUDIENCES[audience_idx[i]],
+            "description": _DESCRIPTION_TEMPLATES[description_idx[i]].format(
+                brand=brand,
+                model=model,
+                sub=_SUBCATEGORY_LOWER[sub],
+                f0=features[f0],
+                f1=features[f1],
+                f2=features[f2]
+            )
+        })
+    return products
+
+def _write_shard(args: Tuple[np.random.SeedSequence, int, int, str]) -> Tuple[str, int]:
+    """Tek bir shard'ı kendi seed'iyle üretip geçici NDJSON dosyasına yazar"""
+    seed_seq, count, start_id, path = args
+    rng = np.random.default_rng(seed_seq)
+    with open(path, "wb") as f:
+        for product in generate_product_block(rng, count, start_id):
+            f.write(orjson.dumps(product))
+            f.write(b"\n")
+    return path, count
+
+def generate_products_ndjson(
+    count: int,
+    filename: str = "products.ndjson",
+    seed: Optional[int] = None,
+    processes: Optional[int] = None,
+    shard_size: int = GENERATOR_SHARD_SIZE
+) -> int:
+    """count ürünü birden fazla process'te üretip NDJSON dosyasına akıtır.
+
+    Her shard'ın seed'i SeedSequence(seed).spawn ile türetilir; aynı seed
+    ve shard_size ile çıktı process sayısından bağımsız olarak aynıdır.
+    Shard'lar sırayla birleştirildiği için id'ler dosyada artan sıradadır.
+    """
+    started_at = time.time()
+    shard_count = (count + shard_size - 1) // shard_size
+    seeds = np.random.SeedSequence(seed).spawn(shard_count)
+    shards = [
+        (
+            seeds[shard],
+            min(shard_size, count - shard * shard_size),
+            shard * shard_size + 1,
+            f"{filename}.part{shard}"
+        )
+        for shard in range(shard_count)
+    ]
+
+    written = 0
+    with open(filename, "wb") as out, Pool(processes or os.cpu_count()) as pool:
+        for path, shard_written in pool.imap(_write_shard, shards):
+            with open(path, "rb") as part:
+                shutil.copyfileobj(part, out)
+            os.remove(path)
+            written += shard_written
+            print(f"İlerleme: {written}/{count} ürün ({written / (time.time() - started_at):.0f} ürün/saniye)")
+
+    print(f"{written} ürün {time.time() - started_at:.2f} saniyede {filename} dosyasına yazıldı")
+    return written
+
 if __name__ == "__main__":
-    print("Ürünler oluşturuluyor...")
-    products = generate_products()
-    print(f"{len(products)} ürün oluşturuldu.")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Örnek ürün verisi üret")
+    parser.add_argument("--count", type=int, default=300000)
+    parser.add_argument("--output", default="products.ndjson")
+    parser.add_argument("--seed", type=int, default=None, help="Aynı seed aynı veriyi üretir")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
     
-    print("Ürünler JSON dosyasına kaydediliyor...")
-    save_products(products)
-    print("İşlem tamamlandı.") 
\ No newline at end of file
+    print("Ürünler oluşturuluyor...")
+    generate_products_ndjson(args.count, args.output, seed=args.seed, processes=args.processes)
+    print("İşlem tamamlandı.")
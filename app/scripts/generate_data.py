@@ -4,8 +4,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from app.database.database import SessionLocal, engine, Base
-from app.models.product import Product
+from app.database.database import engine, Base
+from app.models.product import Product  # noqa: F401 - create_all products tablosunu görsün
+from app.database.copy_loader import copy_products
 
 # Faker instance'ı oluştur
 fake = Faker(['tr_TR'])
@@ -140,7 +141,7 @@ def generate_description(brand, model, category, target_audience, price):
         income_group=income_group
     )
 
-def generate_products(db, count=5000):
+def generate_products(count=5000):
     products = []
     for _ in range(count):
         category = random.choice(categories)
@@ -149,30 +150,23 @@ def generate_products(db, count=5000):
         target_audience = random.choice(target_audiences)
         price = generate_price_by_income_group(brand)
         
-        product = Product(
-            brand=brand,
-            price=price,
-            category=category,
-            model=model,
-            target_audience=target_audience,
-            description=generate_description(brand, model, category, target_audience, price)
-        )
-        products.append(product)
+        products.append({
+            "brand": brand,
+            "price": price,
+            "category": category,
+            "model": model,
+            "target_audience": target_audience,
+            "description": generate_description(brand, model, category, target_audience, price)
+        })
     
-    db.bulk_save_objects(products)
-    db.commit()
+    # ORM yerine COPY FROM STDIN; mevcut ürünleri de aynı işlemde temizler
+    copy_products(products, truncate=True)
 
 def main():
     Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
     
-    # Önce mevcut verileri temizle
-    db.query(Product).delete()
-    db.commit()
-    
-    # Yeni verileri oluştur
-    generate_products(db)
-    db.close()
+    # Yeni verileri oluştur (mevcut ürünler COPY sırasında temizlenir)
+    generate_products()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
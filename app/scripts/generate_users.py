@@ -0,0 +1,184 @@
+from ..database.database import engine, Base
+from ..database.copy_loader import copy_into
+from ..models.user_preferences import UserPreferences, SearchHistory
+from ..scripts.data_generator import CATEGORIES
+from typing import List, Dict, Any, Tuple
+from sqlalchemy import text
+from dotenv import load_dotenv
+import numpy as np
+import datetime
+import bisect
+import time
+
+# Force reload environment variables at script start
+load_dotenv(override=True)
+
+# Her blok kendi seed'iyle üretilir; aynı seed aynı kullanıcıları üretir,
+# shard sayısı değişse de sonuç aynıdır
+USER_BLOCK_SIZE = 10_000
+
+# Zipf üsleri: popüler kategori/marka/sorgular uzun kuyruğa göre çok daha sık
+CATEGORY_ZIPF = 1.1
+BRAND_ZIPF = 1.3
+QUERY_FORM_PROBS = [0.45, 0.35, 0.20]  # "alt kategori", "marka alt kategori", "marka"
+
+# Aramaların ne kadarı kullanıcının favori kategorilerinden
+FAVORITE_SEARCH_RATIO = 0.7
+HISTORY_DAYS = 180
+
+_SUBCATEGORIES: List[Tuple[str, List[str], Tuple[int, int]]] = [
+    (sub, brands, CATEGORIES[cat]["price_range"])
+    for cat in CATEGORIES
+    for sub, brands in CATEGORIES[cat]["subcategories"].items()
+]
+
+def _zipf_probs(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+_CATEGORY_PROBS = _zipf_probs(len(_SUBCATEGORIES), CATEGORY_ZIPF)
+# Alt kategori başına marka seçimi için kümülatif Zipf olasılıkları
+_BRAND_CDFS = [np.cumsum(_zipf_probs(len(brands), BRAND_ZIPF)).tolist() for _, brands, _ in _SUBCATEGORIES]
+
+def _pick_brand(sub_idx: int, u: float) -> str:
+    """[0, 1) aralığındaki u değerini alt kategorinin Zipf marka dağılımına eşler"""
+    brands = _SUBCATEGORIES[sub_idx][1]
+    return brands[min(bisect.bisect_right(_BRAND_CDFS[sub_idx], u), len(brands) - 1)]
+
+def generate_user_block(
+    rng: np.random.Generator,
+    first_user: int,
+    count: int,
+    avg_searches: float,
+    now: datetime.datetime
+) -> Tuple[List[List[Any]], List[List[Any]]]:
+    """count kullanıcı ve arama geçmişlerini COPY satırları olarak üretir.
+
+    Kategori popülerliği Zipf dağılımlıdır; her kullanıcının 1-3 favori
+    kategorisi ve bunlardan türeyen marka/fiyat tercihleri vardır. Arama
+    sayısı kullanıcı başına log-normal (az sayıda çok aktif kullanıcı),
+    zaman damgaları yakın geçmişe yoğunlaşacak şekilde dağıtılır.
+    """
+    favorite_counts = rng.integers(1, 4, size=count)
+    search_counts = np.minimum(
+        rng.lognormal(np.log(max(avg_searches, 1)) - 0.5, 1.0, size=count).astype(np.int64),
+        int(avg_searches * 50)
+    )
+
+    users = []
+    searches = []
+    for offset in range(count):
+        user_id = f"user{first_user + offset}"
+        favorites = list(dict.fromkeys(
+            rng.choice(len(_SUBCATEGORIES), size=favorite_counts[offset], p=_CATEGORY_PROBS).tolist()
+        ))
+        # Her favori kategoride kullanıcının bir tercih ettiği marka var
+        favorite_brands = [_pick_brand(fav, u) for fav, u in zip(favorites, rng.random(len(favorites)).tolist())]
+        preferred_brands = list(dict.fromkeys(favorite_brands))
+        min_price = min(_SUBCATEGORIES[fav][2][0] for fav in favorites)
+        max_price = max(_SUBCATEGORIES[fav][2][1] for fav in favorites)
+        budget = round(float(rng.uniform(min_price, max_price)), -1)
+        created_at = now - datetime.timedelta(days=float(rng.uniform(HISTORY_DAYS, HISTORY_DAYS * 2)))
+        users.append([
+            user_id,
+            [_SUBCATEGORIES[fav][0] for fav in favorites],
+            preferred_brands,
+            {"min": None, "max": budget},
+            created_at,
+            now
+        ])
+
+        total = int(search_counts[offset])
+        if not total:
+            continue
+        from_favorites = (rng.random(total) < FAVORITE_SEARCH_RATIO).tolist()
+        global_picks = rng.choice(len(_SUBCATEGORIES), size=total, p=_CATEGORY_PROBS).tolist()
+        favorite_picks = rng.choice(favorites, size=total).tolist()
+        forms = rng.choice(len(QUERY_FORM_PROBS), size=total, p=QUERY_FORM_PROBS).tolist()
+        draws = rng.random((total, 5)).tolist()
+        ages = np.minimum(rng.exponential(HISTORY_DAYS / 4, size=total), HISTORY_DAYS).tolist()
+        results = rng.poisson(8, size=total).tolist()
+
+        for i in range(total):
+            brand_draw, category_draw, brand_filter_draw, price_draw, price_value = draws[i]
+            sub_idx = favorite_picks[i] if from_favorites[i] else global_picks[i]
+            subcategory, _, (low, high) = _SUBCATEGORIES[sub_idx]
+            # Favori kategoride kullanıcının tercih ettiği marka öne çıkar
+            if from_favorites[i] and brand_draw < 0.5:
+                brand = favorite_brands[favorites.index(sub_idx)]
+            else:
+                brand = _pick_brand(sub_idx, brand_draw)
+            query = [subcategory.lower(), f"{brand.lower()} {subcategory.lower()}", brand.lower()][forms[i]]
+
+            filters: Dict[str, Any] = {}
+            if category_draw < 0.6:
+                filters["category"] = subcategory
+            if brand_filter_draw < 0.3:
+                filters["brand"] = brand
+            if price_draw < 0.4:
+                filters["max_price"] = round(low + price_value * (high - low), -1)
+
+            searches.append([
+                user_id,
+                query,
+                filters,
+                results[i],
+                now - datetime.timedelta(days=ages[i])
+            ])
+    return users, searches
+
+def generate_users(
+    count: int,
+    seed: int = 0,
+    avg_searches: float = 20,
+    shard: int = 0,
+    shards: int = 1
+) -> Tuple[int, int]:
+    """Kullanıcıları bloklar halinde üretip COPY ile yazar.
+
+    shard/shards verilirse sadece bu shard'a düşen bloklar üretilir; farklı
+    process ya da makinelerde her shard ayrı çalıştırılabilir.
+    """
+    started_at = time.time()
+    now = datetime.datetime.utcnow()
+    block_count = (count + USER_BLOCK_SIZE - 1) // USER_BLOCK_SIZE
+    seeds = np.random.SeedSequence(seed).spawn(block_count)
+    user_total = 0
+    search_total = 0
+
+    for block in range(shard, block_count, shards):
+        first_user = block * USER_BLOCK_SIZE + 1
+        size = min(USER_BLOCK_SIZE, count - block * USER_BLOCK_SIZE)
+        users, searches = generate_user_block(np.random.default_rng(seeds[block]), first_user, size, avg_searches, now)
+        user_total += copy_into(
+            UserPreferences.__tablename__,
+            ["user_id", "favorite_categories", "preferred_brands", "price_range", "created_at", "updated_at"],
+            users
+        )
+        search_total += copy_into(
+            SearchHistory.__tablename__,
+            ["user_id", "query", "filters", "results_count", "created_at"],
+            searches
+        )
+        print(f"İlerleme: {user_total} kullanıcı, {search_total} arama ({time.time() - started_at:.2f} saniye)")
+
+    print(f"{user_total} kullanıcı ve {search_total} arama kaydı {time.time() - started_at:.2f} saniyede eklendi")
+    return user_total, search_total
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sentetik kullanıcı ve arama geçmişi üret")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--avg-searches", type=float, default=20)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--truncate", action="store_true", help="Önce mevcut kullanıcıları ve geçmişi sil")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.truncate:
+        with engine.begin() as conn:
+            conn.execute(text("TRUNCATE search_history, user_preferences"))
+    generate_users(args.count, args.seed, args.avg_searches, args.shard, args.shards)
@@ -0,0 +1,39 @@
+from ..database.database import engine, Base
+from ..database.copy_loader import copy_products
+from ..scripts.data_generator import generate_product_block, GENERATOR_SHARD_SIZE
+from ..utils.json_stream import iter_json_records
+from typing import Iterator, Dict, Any, Optional
+from dotenv import load_dotenv
+import numpy as np
+
+# Force reload environment variables at script start
+load_dotenv(override=True)
+
+def iter_generated_products(count: int, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """data_generator ile aynı shard/seed düzeninde ürünleri parça parça üretir"""
+    shard_count = (count + GENERATOR_SHARD_SIZE - 1) // GENERATOR_SHARD_SIZE
+    for shard, seed_seq in enumerate(np.random.SeedSequence(seed).spawn(shard_count)):
+        size = min(GENERATOR_SHARD_SIZE, count - shard * GENERATOR_SHARD_SIZE)
+        yield from generate_product_block(np.random.default_rng(seed_seq), size, shard * GENERATOR_SHARD_SIZE + 1)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ürünleri COPY FROM STDIN ile PostgreSQL'e yükle")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="JSON dizisi ya da NDJSON ürün dosyası")
+    source.add_argument("--generate", type=int, help="Bu kadar ürün üretip doğrudan yükle")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--staging", action="store_true", help="UNLOGGED staging tablosuna yükleyip sonra yer değiştir (--append ile kullanılamaz)")
+    parser.add_argument("--append", action="store_true", help="Mevcut ürünleri silmeden ekle")
+    args = parser.parse_args()
+    if args.staging and args.append:
+        # Staging tablonun tamamını değiştirir; mevcut ürünler korunamaz
+        parser.error("--staging ve --append birlikte kullanılamaz")
+
+    Base.metadata.create_all(bind=engine)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            copy_products(iter_json_records(f), truncate=not args.append, staging=args.staging)
+    else:
+        copy_products(iter_generated_products(args.generate, args.seed), truncate=not args.append, staging=args.staging)
@@ -1,7 +1,6 @@
-from sqlalchemy.orm import Session
-from ..models.product import Product
-from ..database.database import SessionLocal, engine, Base
-import json
+from ..database.database import engine, Base
+from ..models.product import Product  # noqa: F401 - create_all products tablosunu görsün
+from ..database.copy_loader import copy_products
 
 # Örnek ürün verileri
 sample_products = [
@@ -89,24 +88,13 @@ sample_products = [
 
 def seed_database():
     """Veritabanına örnek ürünleri ekle"""
-    db = SessionLocal()
     try:
-        # Mevcut ürünleri temizle
-        db.query(Product).delete()
-        
-        # Yeni ürünleri ekle
-        for product_data in sample_products:
-            product = Product(**product_data)
-            db.add(product)
-        
-        db.commit()
+        # Mevcut ürünleri temizleyip yenilerini COPY ile ekle
+        copy_products(sample_products, truncate=True)
         print(f"{len(sample_products)} ürün başarıyla eklendi.")
         
     except Exception as e:
         print(f"Hata oluştu: {e}")
-        db.rollback()
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     Base.metadata.create_all(bind=engine)
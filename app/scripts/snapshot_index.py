@@ -0,0 +1,139 @@
+from ..elasticsearch.es_client import get_es_client, get_mapping_hash, get_profile_dynamic_settings, PRODUCT_INDEX
+from ..elasticsearch.index_manager import get_alias_targets, list_index_versions, publish_index, INDEX_VERSION_PREFIX
+from elasticsearch import Elasticsearch, NotFoundError
+from typing import Dict, Any, Optional, List
+from dotenv import load_dotenv
+import datetime
+import time
+import os
+
+# Force reload environment variables at script start
+load_dotenv(override=True)
+
+# Snapshot deposu: ES_SNAPSHOT_LOCATION node'ların path.repo listesinde olmalı
+ES_SNAPSHOT_REPOSITORY = os.getenv("ES_SNAPSHOT_REPOSITORY", "products_backup")
+ES_SNAPSHOT_LOCATION = os.getenv("ES_SNAPSHOT_LOCATION", "/usr/share/elasticsearch/snapshots")
+
+def ensure_repository(es: Elasticsearch) -> None:
+    """Dosya sistemi snapshot deposunu yoksa kaydeder"""
+    try:
+        es.snapshot.get_repository(name=ES_SNAPSHOT_REPOSITORY)
+    except NotFoundError:
+        es.snapshot.create_repository(
+            name=ES_SNAPSHOT_REPOSITORY,
+            body={"type": "fs", "settings": {"location": ES_SNAPSHOT_LOCATION, "compress": True}}
+        )
+        print(f"Snapshot deposu oluşturuldu: {ES_SNAPSHOT_REPOSITORY} -> {ES_SNAPSHOT_LOCATION}")
+
+def get_index_mapping_hash(es: Elasticsearch, index_name: str) -> Optional[str]:
+    """İndeks oluşturulurken mapping'e yazılan özet; eski indekslerde yoktur"""
+    mapping = es.indices.get_mapping(index=index_name)[index_name]["mappings"]
+    return mapping.get("_meta", {}).get("mapping_hash")
+
+def list_snapshots(es: Elasticsearch) -> List[Dict[str, Any]]:
+    """Depodaki başarılı snapshot'lar, en yenisi sonda"""
+    response = es.snapshot.get(repository=ES_SNAPSHOT_REPOSITORY, snapshot="_all")
+    snapshots = [s for s in response.get("snapshots", []) if s.get("state") == "SUCCESS"]
+    return sorted(snapshots, key=lambda s: s.get("start_time_in_millis", 0))
+
+def create_snapshot(es: Elasticsearch) -> Optional[str]:
+    """"products" alias'ının işaret ettiği indeksin snapshot'ını alır"""
+    targets = get_alias_targets(es)
+    if len(targets) != 1:
+        print(f"{PRODUCT_INDEX} alias'ı tek bir indekse işaret etmiyor: {targets}")
+        return None
+    index_name = targets[0]
+
+    mapping_hash = get_index_mapping_hash(es, index_name)
+    if mapping_hash != get_mapping_hash():
+        print(f"{index_name} mevcut mapping ile oluşturulmamış, önce yeniden indeksleyin")
+        return None
+
+    ensure_repository(es)
+    doc_count = es.count(index=index_name)["count"]
+    snapshot_name = f"{index_name}-{mapping_hash[:12]}-{datetime.datetime.utcnow():%Y%m%d%H%M%S}"
+    started_at = time.time()
+    es.options(request_timeout=3600).snapshot.create(
+        repository=ES_SNAPSHOT_REPOSITORY,
+        snapshot=snapshot_name,
+        indices=index_name,
+        include_global_state=False,
+        wait_for_completion=True,
+        metadata={"mapping_hash": mapping_hash, "index": index_name, "doc_count": doc_count}
+    )
+    print(f"Snapshot alındı: {snapshot_name} ({doc_count} döküman, {time.time() - started_at:.2f} saniye)")
+    return snapshot_name
+
+def restore_snapshot(es: Elasticsearch, snapshot_name: Optional[str] = None) -> Optional[str]:
+    """Mapping'i güncel koda uyan snapshot'ı yeni bir sürüm olarak geri yükleyip canlıya alır.
+
+    snapshot_name verilmezse uyumlu en yeni snapshot seçilir. Mapping
+    özeti uyuşmayan snapshot'lar reddedilir.
+    """
+    ensure_repository(es)
+    mapping_hash = get_mapping_hash()
+    snapshots = list_snapshots(es)
+    if snapshot_name:
+        snapshots = [s for s in snapshots if s["snapshot"] == snapshot_name]
+        if not snapshots:
+            print(f"Snapshot bulunamadı: {snapshot_name}")
+            return None
+
+    compatible = [s for s in snapshots if (s.get("metadata") or {}).get("mapping_hash") == mapping_hash]
+    if not compatible:
+        print(f"Güncel mapping ({mapping_hash[:12]}) ile uyumlu snapshot yok; eski snapshot'lar geri yüklenmez")
+        return None
+    snapshot = compatible[-1]
+    metadata = snapshot["metadata"]
+
+    # Mevcut sürümlerle çakışmasın diye bir sonraki sürüm adıyla geri yükle
+    versions = list_index_versions(es)
+    index_name = f"{INDEX_VERSION_PREFIX}{versions[-1][0] + 1 if versions else 1}"
+    started_at = time.time()
+    es.options(request_timeout=3600).snapshot.restore(
+        repository=ES_SNAPSHOT_REPOSITORY,
+        snapshot=snapshot["snapshot"],
+        indices=metadata["index"],
+        rename_pattern=".+",
+        rename_replacement=index_name,
+        include_global_state=False,
+        include_aliases=False,
+        # Replikalar geri yüklemeyi yavaşlatmasın; publish_index profile göre ayarlar
+        index_settings={f"index.{key}": value for key, value in get_profile_dynamic_settings("bulk-load").items()},
+        wait_for_completion=True
+    )
+
+    doc_count = es.count(index=index_name)["count"]
+    if doc_count != metadata.get("doc_count"):
+        print(f"Döküman sayısı uyuşmuyor: {doc_count} != {metadata.get('doc_count')}")
+        es.indices.delete(index=index_name)
+        return None
+
+    print(f"{snapshot['snapshot']} -> {index_name} geri yüklendi ({doc_count} döküman, {time.time() - started_at:.2f} saniye)")
+    publish_index(es, index_name)
+    return index_name
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ürün indeksinin snapshot'ını al veya geri yükle")
+    parser.add_argument("command", choices=["create", "restore", "list"])
+    parser.add_argument("--snapshot", help="Geri yüklenecek snapshot (varsayılan: uyumlu en yenisi)")
+    args = parser.parse_args()
+
+    es = get_es_client()
+    if not es:
+        print("Elasticsearch bağlantısı kurulamadı")
+        raise SystemExit(1)
+
+    if args.command == "create":
+        raise SystemExit(0 if create_snapshot(es) else 1)
+    if args.command == "restore":
+        raise SystemExit(0 if restore_snapshot(es, args.snapshot) else 1)
+
+    ensure_repository(es)
+    current_hash = get_mapping_hash()
+    for snapshot in list_snapshots(es):
+        metadata = snapshot.get("metadata") or {}
+        status = "uyumlu" if metadata.get("mapping_hash") == current_hash else "eski"
+        print(f"{snapshot['snapshot']}: {metadata.get('doc_count')} döküman ({status})")
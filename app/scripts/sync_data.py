@@ -1,108 +1,99 @@
 from ..database.database import SessionLocal
 from ..models.product import Product
-from ..elasticsearch.es_client import get_es_client, PRODUCT_INDEX, PRODUCT_MAPPING
-import json
-from typing import List, Dict
-import time
+from ..elasticsearch.es_client import get_es_client
+from ..elasticsearch.bulk_loader import BulkLoader, build_product_action, BULK_WORKERS, BULK_CHUNK_SIZE
+from ..elasticsearch.incremental_sync import sync_products_incremental, SYNC_SAFETY_LAG
+from ..elasticsearch.bulk_throttle import build_default_throttle
+from ..elasticsearch.index_manager import create_versioned_index, publish_index, discard_index
+from ..utils.json_stream import iter_json_records
+from typing import Iterator, Dict, Any
 from dotenv import load_dotenv
+import datetime
 import os
 
 # Force reload environment variables at script start
 load_dotenv(override=True)
 print(f"ELASTICSEARCH_URL in sync_data.py: {os.getenv('ELASTICSEARCH_URL')}")
 
-def chunk_data(data: List[Dict], chunk_size: int = 5000):
-    """Veriyi belirtilen boyutta parçalara ayır"""
-    for i in range(0, len(data), chunk_size):
-        yield data[i:i + chunk_size]
+def iter_product_actions(records: Iterator[Dict[str, Any]], index_name: str) -> Iterator[Dict[str, Any]]:
+    """Dosyadaki ürün kayıtlarını sırayla bulk action'larına çevirir"""
+    # Dosyada id yoksa dosyadaki sıra kullanılır; böylece aynı dosya tekrar
+    # yüklendiğinde dökümanlar çoğalmaz, üzerine yazılır
+    for position, product in enumerate(records, start=1):
+        yield build_product_action(
+            product.get("id") or position,
+            product["brand"],
+            product["model"],
+            product["price"],
+            product["category"],
+            product["target_audience"],
+            product["description"],
+            index=index_name
+        )
 
-def index_products_from_json(json_file: str = "products.json", chunk_size: int = 5000):
-    """JSON dosyasından ürünleri Elasticsearch'e aktar"""
+def index_products_from_json(json_file: str = "products.json", chunk_size: int = BULK_CHUNK_SIZE, workers: int = BULK_WORKERS):
+    """JSON dizisi ya da NDJSON dosyasından ürünleri Elasticsearch'e aktar.
+
+    Dosya kayıt kayıt okunur; sınırlı kuyruk dolunca okuma bekler, bu yüzden
+    bellek kullanımı dosya boyutundan bağımsızdır.
+    """
     es = get_es_client()
     if not es:
         print("Elasticsearch bağlantısı kurulamadı")
         return False
 
+    index_name = None
     try:
-        # JSON dosyasını oku
-        with open(json_file, 'r', encoding='utf-8') as f:
-            products = json.load(f)
-        
-        print(f"Toplam {len(products)} ürün yüklenecek")
-        
-        # İndeksi oluştur veya güncelle
-        if es.indices.exists(index=PRODUCT_INDEX):
-            print(f"{PRODUCT_INDEX} indeksi siliniyor...")
-            es.indices.delete(index=PRODUCT_INDEX)
-        
-        print(f"{PRODUCT_INDEX} indeksi oluşturuluyor...")
-        es.indices.create(index=PRODUCT_INDEX, body=PRODUCT_MAPPING)
-        
-        # Bulk indexing için veriyi hazırla ve yükle
-        start_time = time.time()
-        total_indexed = 0
+        # Yeni sürümlü indekse yükle; "products" alias'ı yükleme bitene kadar eski indekste kalır
+        index_name = create_versioned_index(es)
+        # Dosyadaki ürünler yüklenirken veritabanında değişenler yayından sonra tekrar gönderilir
+        loaded_since = datetime.datetime.utcnow() - SYNC_SAFETY_LAG
         
-        for chunk in chunk_data(products, chunk_size):
-            bulk_data = []
-            for product in chunk:
-                # Index action
-                bulk_data.append({
-                    "index": {
-                        "_index": PRODUCT_INDEX,
-                        "_id": product.get("id", None)
-                    }
-                })
-                # Document
-                product_doc = {
-                    "brand": product["brand"],
-                    "model": product["model"],
-                    "price": product["price"],
-                    "category": product["category"],
-                    "target_audience": product["target_audience"],
-                    "description": product["description"],
-                    "suggest": {
-                        "input": [
-                            product["brand"],
-                            product["model"],
-                            product["category"]
-                        ]
-                    }
-                }
-                bulk_data.append(product_doc)
-            
-            # Bulk request gönder
-            if bulk_data:
-                es.bulk(operations=bulk_data, refresh=False)
-                total_indexed += len(chunk)
-                elapsed_time = time.time() - start_time
-                docs_per_second = total_indexed / elapsed_time
-                print(f"İlerleme: {total_indexed}/{len(products)} döküman ({docs_per_second:.2f} döküman/saniye)")
+        loader = BulkLoader(es, workers=workers, chunk_size=chunk_size, throttle=build_default_throttle(es))
+        with open(json_file, 'r', encoding='utf-8') as f:
+            stats = loader.run(iter_product_actions(iter_json_records(f), index_name))
         
-        # İndeksi yenile
-        es.indices.refresh(index=PRODUCT_INDEX)
+        if stats["failed"]:
+            print(f"{stats['failed']} ürün indexlenemedi, {index_name} yayınlanmayacak. Örnek hatalar: {stats['errors']}")
+            discard_index(es, index_name)
+            return False
         
-        total_time = time.time() - start_time
-        print(f"\nToplam {total_indexed} ürün {total_time:.2f} saniyede yüklendi")
-        print(f"Ortalama hız: {total_indexed/total_time:.2f} döküman/saniye")
+        # Yükleme bitti: serving ayarları, force merge, warmup ve alias değişimi
+        publish_index(es, index_name, loaded_since=loaded_since)
         
         return True
 
     except Exception as e:
         print(f"İndeksleme hatası: {e}")
+        if index_name:
+            discard_index(es, index_name)
         return False
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Ürünleri Elasticsearch'e senkronize et")
+    parser.add_argument("--incremental", action="store_true", help="Sadece son senkronizasyondan beri değişen ürünleri veritabanından aktar")
+    parser.add_argument("--file", help="Örnek veri üretmeden bu JSON/NDJSON dosyasını yükle")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        stats = sync_products_incremental()
+        raise SystemExit(0 if stats and not stats["failed"] else 1)
+    
+    if args.file:
+        raise SystemExit(0 if index_products_from_json(args.file) else 1)
+    
     # Önce örnek verileri oluştur
-    from ..scripts.data_generator import generate_products, save_products
+    from ..scripts.data_generator import generate_products_ndjson
     
     print("Örnek veriler oluşturuluyor...")
-    products = generate_products(300000)
-    save_products(products)
+    generate_products_ndjson(300000, "products.ndjson")
     print("Örnek veriler oluşturuldu.")
     
     # Verileri Elasticsearch'e yükle
     print("\nVeriler Elasticsearch'e yükleniyor...")
-    success = index_products_from_json()
+    success = index_products_from_json("products.ndjson")
     
     if success:
         print("\nTüm işlemler başarıyla tamamlandı!")
@@ -1,8 +1,13 @@
 import redis
 from typing import Optional, Any
-import json
 import os
 from dotenv import load_dotenv
+from ..utils.cache_codec import get_cache_codec
+from ..utils.cache_generation import CacheGeneration
+
+# Key'ler cache:g<nesil>:<key> şeklinde saklanır; clear() nesli artırır
+CACHE_KEY_PREFIX = "cache"
+CACHE_GENERATION_KEY = f"{CACHE_KEY_PREFIX}:generation"
 
 # Load environment variables
 load_dotenv()
@@ -13,13 +18,13 @@ class CacheService:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(CacheService, cls).__new__(cls)
+            cls._instance.codec = get_cache_codec()
             try:
                 # Redis bağlantısını kur
                 cls._instance.redis = redis.Redis(
                     host=os.getenv('REDIS_HOST', 'localhost'),
                     port=int(os.getenv('REDIS_PORT', 6379)),
-                    db=int(os.getenv('REDIS_DB', 0)),
-                    decode_responses=True
+                    db=int(os.getenv('REDIS_DB', 0))
                 )
                 # Bağlantıyı test et
                 cls._instance.redis.ping()
@@ -27,16 +32,20 @@ class CacheService:
             except redis.ConnectionError as e:
                 print(f"Redis connection failed: {e}")
                 cls._instance.redis = None
+            cls._instance.generation = CacheGeneration(cls._instance.redis, CACHE_GENERATION_KEY)
         return cls._instance
 
+    def _key(self, key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:g{self.generation.current()}:{key}"
+
     def get(self, key: str) -> Optional[Any]:
         """Redis'ten veri çek"""
         if not self.redis:
             return None
             
         try:
-            data = self.redis.get(key)
-            return json.loads(data) if data else None
+            data = self.redis.get(self._key(key))
+            return self.codec.decode(data) if data else None
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
@@ -48,9 +57,9 @@ class CacheService:
             
         try:
             self.redis.setex(
-                name=key,
+                name=self._key(key),
                 time=expire,
-                value=json.dumps(value)
+                value=self.codec.encode(value)
             )
             return True
         except Exception as e:
@@ -63,19 +72,23 @@ class CacheService:
             return False
             
         try:
-            self.redis.delete(key)
+            self.redis.delete(self._key(key))
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
             return False
 
     def clear(self) -> bool:
-        """Tüm cache'i temizle"""
+        """Tüm cache'i temizle
+
+        Veritabanındaki diğer key'lere dokunmamak için flushdb yerine nesil
+        artırılır; eski nesildeki key'ler okunmaz ve TTL'leriyle düşer.
+        """
         if not self.redis:
             return False
             
         try:
-            self.redis.flushdb()
+            self.generation.bump()
             return True
         except Exception as e:
             print(f"Cache clear error: {e}")
@@ -0,0 +1,122 @@
+from typing import Dict, Any, Iterable, Tuple
+from sqlalchemy import update
+from dotenv import load_dotenv
+import time
+import os
+from ..database.database import SessionLocal
+from ..models.product import Product
+from ..elasticsearch.es_client import get_es_client, get_document_routing, PRODUCT_INDEX
+from ..elasticsearch.bulk_loader import BulkLoader, build_product_action
+from ..elasticsearch.cache_manager import CacheManager
+
+load_dotenv()
+
+# Fiyat beslemesi tek seferde bu kadar ürünü işler
+PRICE_UPDATE_BATCH_SIZE = int(os.getenv("PRICE_UPDATE_BATCH_SIZE", "5000"))
+PRICE_UPDATE_WORKERS = int(os.getenv("PRICE_UPDATE_WORKERS", "2"))
+
+def normalize_price_updates(updates: Iterable[Tuple[int, float]]) -> Dict[int, float]:
+    """Aynı ürün için gelen birden fazla fiyattan sonuncusunu tutar, geçersizleri atar"""
+    prices = {}
+    for product_id, price in updates:
+        try:
+            product_id, price = int(product_id), round(float(price), 2)
+        except (TypeError, ValueError):
+            continue
+        if price >= 0:
+            prices[product_id] = price
+    return prices
+
+def build_price_update_action(row, price: float) -> Dict[str, Any]:
+    """Sadece fiyatı (ve içerik özetini) değiştiren kısmi bulk update action'ı"""
+    source = build_product_action(*row[:3], price, *row[4:])["_source"]
+    action = {
+        "_op_type": "update",
+        "_index": PRODUCT_INDEX,
+        "_id": row.id,
+        "doc": {"price": price, "content_hash": source["content_hash"]}
+    }
+    routing = get_document_routing(row.category)
+    if routing:
+        action["routing"] = routing
+    return action
+
+def _apply_batch(db, es, cache_mgr: CacheManager, prices: Dict[int, float], stats: Dict[str, Any]) -> None:
+    # Silinmiş ya da bilinmeyen ürünleri ayıkla; routing ve içerik özeti için satırları da al
+    rows = db.query(
+        Product.id,
+        Product.brand,
+        Product.model,
+        Product.price,
+        Product.category,
+        Product.target_audience,
+        Product.description
+    ).filter(Product.id.in_(prices.keys()), Product.deleted_at.is_(None)).all()
+    stats["missing"] += len(prices) - len(rows)
+    changed = [row for row in rows if row.price != prices[row.id]]
+    stats["unchanged"] += len(rows) - len(changed)
+    if not changed:
+        return
+
+    # Primary key'e göre toplu UPDATE (executemany); updated_at onupdate ile ilerler
+    db.execute(update(Product), [{"id": row.id, "price": prices[row.id]} for row in changed])
+    db.commit()
+    stats["updated"] += len(changed)
+
+    # wait_for: istek, güncellemeler bir sonraki periyodik refresh ile
+    # aranabilir olana kadar döner. Invalidation'dan sonraki ilk miss yeni
+    # fiyatı okur; her çağrıda zorla refresh yapılıp küçük segment üretilmez
+    # ve shard request cache'i boşa temizlenmez.
+    loader = BulkLoader(es, workers=PRICE_UPDATE_WORKERS, refresh="wait_for")
+    result = loader.run(build_price_update_action(row, prices[row.id]) for row in changed)
+    stats["es_failed"] += result["failed"]
+    stats["errors"].extend(result["errors"][:max(0, 10 - len(stats["errors"]))])
+
+    # Bu ürünlerin cache'lenmiş dokümanlarını düşür; onları içeren aramalar yeniden hesaplanır
+    stats["invalidated"] += cache_mgr.invalidate_products(row.id for row in changed)
+
+def apply_price_updates(updates: Iterable[Tuple[int, float]], batch_size: int = PRICE_UPDATE_BATCH_SIZE) -> Dict[str, Any]:
+    """(id, fiyat) güncellemelerini PostgreSQL'e, Elasticsearch'e ve cache'e yansıtır.
+
+    Veritabanı önce güncellenir; Elasticsearch'e sadece price alanı kısmi
+    update olarak gider. Elasticsearch'e yazılamayan ürünler veritabanında
+    güncel olduğundan bir sonraki artımlı senkronizasyonda düzelir.
+    Fiyat aralığı filtreli ya da facet'li aramalarda, ürünü hit olarak
+    içermeyen entry'ler TTL'lerine kadar eski fiyatla kalabilir.
+    """
+    started_at = time.time()
+    prices = normalize_price_updates(updates)
+    stats = {
+        "received": len(prices),
+        "updated": 0,
+        "unchanged": 0,
+        "missing": 0,
+        "es_failed": 0,
+        "invalidated": 0,
+        "errors": []
+    }
+    if not prices:
+        return stats
+
+    es = get_es_client()
+    if not es:
+        raise RuntimeError("Elasticsearch bağlantısı kurulamadı")
+
+    cache_mgr = CacheManager()
+    db = SessionLocal()
+    try:
+        items = list(prices.items())
+        for start in range(0, len(items), batch_size):
+            _apply_batch(db, es, cache_mgr, dict(items[start:start + batch_size]), stats)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    stats["seconds"] = round(time.time() - started_at, 2)
+    print(
+        f"Fiyat güncellemesi: {stats['updated']} güncellendi, {stats['unchanged']} aynı, "
+        f"{stats['missing']} bulunamadı, {stats['invalidated']} cache kaydı silindi ({stats['seconds']} saniye)"
+    )
+    return stats
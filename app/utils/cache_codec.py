@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, Tuple
+from dotenv import load_dotenv
+import zlib
+import os
+import orjson
+
+# Opsiyonel kütüphaneler: kurulu değilse ilgili format yazılmaz,
+# okunurken de anlaşılır bir hata verilir
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+load_dotenv()
+
+# Cache değerleri: [sürüm][serializer][sıkıştırma] başlığı + gövde.
+# Sürüm byte'ı geçerli bir JSON başlangıcı olamaz; başlıksız eski JSON
+# değerler de okunabilir, format değiştiğinde sürüm artırılır.
+CODEC_VERSION = 1
+
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "orjson").lower()
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zstd").lower()
+# Bu boyutun altındaki gövdeler sıkıştırılmaz
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))
+CACHE_ZSTD_LEVEL = int(os.getenv("CACHE_ZSTD_LEVEL", "3"))
+
+class CacheCodecError(ValueError):
+    """Cache değeri çözülemediğinde (bilinmeyen sürüm/format ya da eksik kütüphane)"""
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=str)
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+# id -> (ad, dumps, loads); id'ler kalıcıdır, değiştirilmemelidir
+SERIALIZERS: Dict[int, Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    0: ("orjson", _orjson_dumps, orjson.loads),
+}
+if msgpack is not None:
+    SERIALIZERS[1] = ("msgpack", _msgpack_dumps, _msgpack_loads)
+
+COMPRESSORS: Dict[int, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    0: ("none", lambda data: data, lambda data: data),
+    3: ("zlib", lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    # Compressor nesneleri thread'ler arasında paylaşılamaz; modül fonksiyonları kullanılır
+    COMPRESSORS[1] = (
+        "zstd",
+        lambda data: zstandard.compress(data, CACHE_ZSTD_LEVEL),
+        zstandard.decompress
+    )
+if lz4_frame is not None:
+    COMPRESSORS[2] = ("lz4", lz4_frame.compress, lz4_frame.decompress)
+
+def _resolve(table: Dict[int, Tuple[str, Any, Any]], name: str, fallback: int) -> int:
+    for codec_id, (codec_name, _, _) in table.items():
+        if codec_name == name:
+            return codec_id
+    print(f"Cache codec '{name}' kullanılamıyor, '{table[fallback][0]}' kullanılacak")
+    return fallback
+
+class CacheCodec:
+    """Cache değerlerini sürüm başlıklı, opsiyonel sıkıştırmalı byte'lara çevirir"""
+
+    def __init__(
+        self,
+        serializer: str = CACHE_SERIALIZER,
+        compression: str = CACHE_COMPRESSION,
+        threshold: int = CACHE_COMPRESSION_THRESHOLD
+    ):
+        self.serializer_id = _resolve(SERIALIZERS, serializer, 0)
+        # zlib standart kütüphanede olduğu için sıkıştırmanın yedeği
+        self.compression_id = _resolve(COMPRESSORS, compression, 3 if compression != "none" else 0)
+        self.threshold = threshold
+
+    def encode(self, value: Any) -> bytes:
+        body = SERIALIZERS[self.serializer_id][1](value)
+        compression_id = 0
+        if self.compression_id and len(body) >= self.threshold:
+            compressed = COMPRESSORS[self.compression_id][1](body)
+            # Sıkışmayan veride açma maliyetine girme
+            if len(compressed) < len(body):
+                body, compression_id = compressed, self.compression_id
+        return bytes((CODEC_VERSION, self.serializer_id, compression_id)) + body
+
+    def decode(self, data: bytes) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data or data[0] != CODEC_VERSION:
+            # Codec öncesi yazılmış düz JSON değer
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                raise CacheCodecError(f"Bilinmeyen cache formatı: {data[:3]!r}")
+
+        serializer = SERIALIZERS.get(data[1])
+        compressor = COMPRESSORS.get(data[2])
+        if serializer is None or compressor is None:
+            raise CacheCodecError(f"Desteklenmeyen cache formatı: serializer={data[1]}, sıkıştırma={data[2]}")
+        return serializer[2](compressor[2](data[3:]))
+
+_default_codec = None
+
+def get_cache_codec() -> CacheCodec:
+    """Ortam değişkenleriyle yapılandırılmış paylaşılan codec"""
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = CacheCodec()
+    return _default_codec
@@ -0,0 +1,54 @@
+from typing import Optional
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+load_dotenv()
+
+# Nesil sayacı Redis'ten en fazla bu sıklıkla okunur; başka bir process'te
+# yapılan artış en geç bu süre sonunda görülür
+CACHE_GENERATION_REFRESH_SECONDS = float(os.getenv("CACHE_GENERATION_REFRESH_SECONDS", "1"))
+
+class CacheGeneration:
+    """Redis'te tutulan, cache key'lerine eklenen nesil (generation) sayacı.
+
+    Sayaç artırıldığında eski nesildeki tüm key'ler mantıksal olarak
+    geçersiz olur; tarama ya da flush yapılmaz, eski entry'ler TTL ile düşer.
+    Redis yoksa sayaç sadece process içinde tutulur.
+    """
+
+    def __init__(self, client, key: str, refresh_seconds: float = CACHE_GENERATION_REFRESH_SECONDS):
+        self.client = client
+        self.key = key
+        self.refresh_seconds = refresh_seconds
+        self._value = 0
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """Geçerli nesil; kısa süreliğine process içinde tutulur"""
+        if not self.client:
+            return self._value
+        now = time.monotonic()
+        if self._fetched_at is not None and now - self._fetched_at < self.refresh_seconds:
+            return self._value
+        try:
+            value = self.client.get(self.key)
+            with self._lock:
+                self._value = int(value or 0)
+                self._fetched_at = now
+        except Exception as e:
+            # Redis'e ulaşılamazsa son bilinen nesille devam et
+            print(f"Cache nesli okunamadı ({self.key}): {e}")
+        return self._value
+
+    def bump(self) -> int:
+        """Nesli atomik olarak artırır ve yeni değeri döndürür"""
+        with self._lock:
+            if not self.client:
+                self._value += 1
+                return self._value
+            self._value = int(self.client.incr(self.key))
+            self._fetched_at = time.monotonic()
+            return self._value
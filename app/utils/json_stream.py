@@ -0,0 +1,91 @@
+from typing import Any, Iterator, TextIO
+import json
+import orjson
+
+# Dosyadan tek seferde okunan karakter sayısı
+READ_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+def iter_ndjson(f: TextIO) -> Iterator[Any]:
+    """Satır başına bir JSON değeri içeren (NDJSON) dosyayı satır satır okur"""
+    for line_no, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"NDJSON satır {line_no} okunamadı: {e}")
+
+def iter_json_array(f: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Büyük bir JSON dizisinin elemanlarını dosyanın tamamını belleğe almadan döndürür.
+
+    Dosya read_size'lık parçalarla okunur ve her eleman
+    JSONDecoder.raw_decode ile ayrıştırılır; bellekte en fazla bir parça ve
+    yarım kalmış tek bir eleman tutulur.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    opened = False
+
+    while True:
+        # Boşlukları ve (dizi açıldıktan sonra) eleman ayraçlarını atla
+        while pos < len(buf) and (buf[pos] in _WHITESPACE or (opened and buf[pos] == ",")):
+            pos += 1
+
+        value = None
+        need_more = pos == len(buf)
+        if not need_more:
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError("JSON dosyası bir dizi ile başlamalı")
+                opened = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # Parçanın sonuna denk gelen sayı ("1." -> 1 gibi) yarım okunmuş
+                # olabilir; elemanın ardından bir ayraç görülene kadar kabul etme
+                after = end
+                while after < len(buf) and buf[after] in _WHITESPACE:
+                    after += 1
+                if after == len(buf):
+                    need_more = not eof
+                elif buf[after] not in ",]":
+                    if eof:
+                        raise ValueError(f"JSON dizisinde beklenmeyen karakter: {buf[after]!r}")
+                    need_more = True
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                need_more = True
+
+        if need_more:
+            if eof:
+                raise ValueError("JSON dizisi beklenmedik şekilde bitti")
+            chunk = f.read(read_size)
+            eof = not chunk
+            # İşlenmiş kısmı at, yarım kalan elemanı yeni parçayla birleştir
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        yield value
+        pos = end
+
+def iter_json_records(f: TextIO) -> Iterator[Any]:
+    """Dosya biçimini ilk karakterden anlayıp JSON dizisi ya da NDJSON olarak akıtır"""
+    first = ""
+    while True:
+        first = f.read(1)
+        if not first or first not in _WHITESPACE:
+            break
+    f.seek(0)
+    if first == "[":
+        return iter_json_array(f)
+    return iter_ndjson(f)